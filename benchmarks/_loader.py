@@ -0,0 +1,8 @@
+# Recorded API payloads shared by the benchmarks and the replay server.
+from pathlib import Path
+
+PAYLOAD_DIR = Path(__file__).resolve().parent / "payloads"
+
+def load_payload(name: str) -> bytes:
+    """Return a recorded API response body."""
+    return (PAYLOAD_DIR / name).read_bytes()
@@ -0,0 +1,55 @@
+"""Micro-benchmark: device payload decoding, previous path vs. single-pass path.
+
+The previous path decoded the body to text, parsed it with ``json.loads`` and
+merged ``device`` and ``lastReading`` into a new dict. The current path parses
+the bytes once (orjson when installed) into a ``TankReading``.
+
+    python benchmarks/bench_decode.py [--iterations N] [--json]
+"""
+import argparse
+import json
+import sys
+import timeit
+from pathlib import Path
+
+from _loader import load_payload
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from custom_components.generac_tank_utility import models  # noqa: E402
+
+def previous_path(body: bytes) -> dict:
+    raw_data = json.loads(body.decode("utf-8"))
+    device_info = raw_data.get("device", {})
+    last_reading = device_info.pop("lastReading", {}) if isinstance(device_info, dict) else {}
+    return {**device_info, **last_reading}
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=50000)
+    parser.add_argument("--json", action="store_true", help="emit machine-readable results")
+    args = parser.parse_args()
+
+    body = load_payload("device.json")
+
+    def current_path(body: bytes):
+        return models.TankReading.from_payload(models.decode_json(body))
+
+    assert previous_path(body)["tank"] == current_path(body)["tank"]
+    results = {"backend": "orjson" if models.orjson is not None else "json", "iterations": args.iterations}
+    for label, func in (("previous", previous_path), ("current", current_path)):
+        seconds = min(timeit.repeat(lambda: func(body), number=args.iterations, repeat=5))
+        results[f"{label}_us_per_payload"] = round(seconds / args.iterations * 1e6, 3)
+    results["speedup"] = round(results["previous_us_per_payload"] / results["current_us_per_payload"], 2)
+    results["reading_size_bytes"] = sys.getsizeof(current_path(body))
+    results["merged_dict_size_bytes"] = sys.getsizeof(previous_path(body))
+
+    if args.json:
+        print(json.dumps(results))
+    else:
+        for key, value in results.items():
+            print(f"{key:>24}: {value}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
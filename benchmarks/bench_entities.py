@@ -0,0 +1,127 @@
+"""Entity update benchmark: CPU cost of pushing a new reading to every tank.
+
+Sets up the integration against the replay API, then repeatedly hands every
+device coordinator a changed reading and waits for all state writes. Reports
+event loop thread CPU time (the median round) per tank update and per entity
+state write; executor work such as history file writes is excluded. It also
+times the entities' own share of a write in isolation: computing the state and
+attributes Home Assistant reads from every entity (best of several passes).
+
+Needs Home Assistant and pytest-homeassistant-custom-component.
+
+    python benchmarks/bench_entities.py --sizes 10,100,1000 --rounds 20
+"""
+import argparse
+import asyncio
+import json
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from fake_api import EMAIL, PASSWORD, FakeTankUtilityAPI
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from custom_components.generac_tank_utility import api  # noqa: E402
+from custom_components.generac_tank_utility.const import DOMAIN, CONF_EMAIL, CONF_PASSWORD, CONF_DEVICES  # noqa: E402
+from custom_components.generac_tank_utility.models import TankReading  # noqa: E402
+
+async def bench_size(size: int, rounds: int) -> dict:
+    from homeassistant import loader
+    from homeassistant.helpers.entity_platform import async_get_platforms
+    from pytest_homeassistant_custom_component.common import MockConfigEntry, async_test_home_assistant
+
+    server = FakeTankUtilityAPI(devices=size)
+    await server.start()
+    api.API_BASE = server.base_url
+    # A fresh storage directory per run, so no tokens, readings or history carry over between runs.
+    storage_dir = tempfile.mkdtemp(prefix="bench_entities_")
+    try:
+        async with async_test_home_assistant(storage_dir=storage_dir) as hass:
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+            entry = MockConfigEntry(
+                domain=DOMAIN,
+                data={
+                    CONF_EMAIL: EMAIL,
+                    CONF_PASSWORD: PASSWORD,
+                    CONF_DEVICES: [{"id": dev_id, "name": f"Tank {i:04d}"} for i, dev_id in enumerate(server.device_ids)]
+                }
+            )
+            entry.add_to_hass(hass)
+            assert await hass.config_entries.async_setup(entry.entry_id)
+            coordinators = hass.data[DOMAIN][entry.entry_id]["coordinators"]
+            while any(coord.data is None for coord in coordinators.values()):
+                await asyncio.sleep(0.01)
+            await hass.async_block_till_done()
+            entities = len(hass.states.async_entity_ids())
+            readings = {dev_id: server.device_payload(dev_id) for dev_id in coordinators}
+
+            platform_entities = [
+                entity for platform in async_get_platforms(hass, DOMAIN) for entity in platform.entities.values()
+            ]
+            round_times = []
+            calculation_times = []
+            for round_number in range(rounds):
+                # Build each round's readings outside the timed section.
+                batch = []
+                for dev_id, payload in readings.items():
+                    last_reading = payload["device"]["lastReading"]
+                    last_reading["time"] += 3600 * 1000
+                    last_reading["tank"] = round(last_reading["tank"] - 0.1, 1)
+                    last_reading["temperature"] = 40.0 + round_number % 7
+                    batch.append((coordinators[dev_id], TankReading.from_payload(payload)))
+                started = time.thread_time()
+                for coord, reading in batch:
+                    coord.async_set_updated_data(reading)
+                await hass.async_block_till_done()
+                round_times.append(time.thread_time() - started)
+                for _ in range(5):
+                    started = time.perf_counter()
+                    for entity in platform_entities:
+                        entity._async_calculate_state()
+                    calculation_times.append(time.perf_counter() - started)
+
+            await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_block_till_done()
+            await hass.async_stop(force=True)
+    finally:
+        await server.stop()
+        shutil.rmtree(storage_dir, ignore_errors=True)
+    median = statistics.median(round_times)
+    return {
+        "devices": size,
+        "entities": entities,
+        "rounds": rounds,
+        "cpu_s_per_round": round(median, 4),
+        "cpu_us_per_tank_update": round(median / size * 1e6, 1),
+        "cpu_us_per_entity_write": round(median / entities * 1e6, 1),
+        "us_per_entity_state_calculation": round(min(calculation_times) / len(platform_entities) * 1e6, 2)
+    }
+
+async def run(args) -> list:
+    results = []
+    for size in args.sizes:
+        result = await bench_size(size, args.rounds)
+        print(json.dumps(result), file=sys.stderr)
+        results.append(result)
+    return results
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark per-update entity CPU cost.")
+    parser.add_argument("--sizes", default="10,100,1000", type=lambda value: [int(v) for v in value.split(",")])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    report = {"benchmark": "entities", "results": asyncio.run(run(args))}
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+"""Fleet benchmark: client, entry setup and entity platforms against the replay API.
+
+For each fleet size it reports wall time, API request count, peak Python memory
+and worst event-loop lag, and writes the results as JSON for regression comparison.
+
+Phases:
+  client  TankUtilityClient lists devices and fetches all of them (bounded concurrency)
+  setup   async_setup_entry and the sensor/binary_sensor platforms until every tank has data
+  poll    one full poll cycle of every device coordinator
+
+The setup/poll phases need Home Assistant and pytest-homeassistant-custom-component.
+
+    python benchmarks/bench_fleet.py --sizes 1,10,100,1000 --latency 0.02 --output bench_results.json
+"""
+import argparse
+import asyncio
+import json
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from fake_api import EMAIL, PASSWORD, FakeTankUtilityAPI
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from custom_components.generac_tank_utility import api  # noqa: E402
+from custom_components.generac_tank_utility.const import (  # noqa: E402
+    DOMAIN, CONF_EMAIL, CONF_PASSWORD, CONF_DEVICES, CONF_POLL_MODE, DEFAULT_MAX_CONCURRENCY
+)
+
+class LoopLagMonitor:
+    """Measure how late the event loop wakes a short sleeper."""
+
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.max_lag = 0.0
+        self._task = None
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            await asyncio.sleep(self.interval)
+            self.max_lag = max(self.max_lag, loop.time() - started - self.interval)
+
+    def __enter__(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+        return self
+
+    def __exit__(self, *exc_info):
+        self._task.cancel()
+
+class Phase:
+    """Context manager collecting wall time, request count, peak memory and loop lag."""
+
+    def __init__(self, server: FakeTankUtilityAPI):
+        self.server = server
+        self.result = {}
+
+    def __enter__(self):
+        self.server.requests.clear()
+        self.server.statuses.clear()
+        tracemalloc.reset_peak()
+        self._memory_start = tracemalloc.get_traced_memory()[0]
+        self._lag = LoopLagMonitor().__enter__()
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        wall = time.perf_counter() - self._started
+        self._lag.__exit__(*exc_info)
+        self.result.update({
+            "wall_s": round(wall, 4),
+            "requests": self.server.stats()["total_requests"],
+            "statuses": self.server.stats()["statuses"],
+            "peak_memory_kib": round((tracemalloc.get_traced_memory()[1] - self._memory_start) / 1024, 1),
+            "max_loop_lag_ms": round(self._lag.max_lag * 1000, 2)
+        })
+
+async def bench_client(server: FakeTankUtilityAPI) -> dict:
+    client = api.TankUtilityClient(None, EMAIL, PASSWORD, api_base=server.base_url)
+    semaphore = asyncio.Semaphore(DEFAULT_MAX_CONCURRENCY)
+
+    async def _fetch(device_id):
+        async with semaphore:
+            return await client.async_get_device_data(device_id)
+
+    try:
+        with Phase(server) as phase:
+            devices = await client.async_list_devices()
+            results = await asyncio.gather(*(_fetch(dev_id) for dev_id in devices), return_exceptions=True)
+        phase.result["failed"] = sum(1 for result in results if isinstance(result, BaseException))
+        phase.result["pool"] = client.pool_statistics()
+        return phase.result
+    finally:
+        await client.async_close()
+
+async def bench_entry(server: FakeTankUtilityAPI, size: int, poll_mode: str, timeout: float) -> dict:
+    from homeassistant import loader
+    from pytest_homeassistant_custom_component.common import MockConfigEntry, async_test_home_assistant
+
+    results = {}
+    # A fresh storage directory per run, so no tokens, readings or history carry over between runs.
+    with tempfile.TemporaryDirectory(prefix="bench_fleet_") as storage_dir:
+        async with async_test_home_assistant(storage_dir=storage_dir) as hass:
+            # Equivalent of the enable_custom_integrations fixture.
+            hass.data.pop(loader.DATA_CUSTOM_COMPONENTS, None)
+            entry = MockConfigEntry(
+                domain=DOMAIN,
+                data={
+                    CONF_EMAIL: EMAIL,
+                    CONF_PASSWORD: PASSWORD,
+                    CONF_DEVICES: [
+                        {"id": dev_id, "name": f"Tank {i:04d}"} for i, dev_id in enumerate(server.device_ids)
+                    ]
+                },
+                options={CONF_POLL_MODE: poll_mode}
+            )
+            entry.add_to_hass(hass)
+            with Phase(server) as phase:
+                assert await hass.config_entries.async_setup(entry.entry_id)
+                phase.result["setup_returned_s"] = round(time.perf_counter() - phase._started, 4)
+                coordinators = hass.data[DOMAIN][entry.entry_id]["coordinators"]
+                deadline = time.monotonic() + timeout
+                while any(coord.data is None for coord in coordinators.values()) and time.monotonic() < deadline:
+                    await asyncio.sleep(0.01)
+                await hass.async_block_till_done()
+            phase.result["devices_with_data"] = sum(1 for coord in coordinators.values() if coord.data is not None)
+            phase.result["entities"] = len(hass.states.async_entity_ids())
+            results["setup"] = phase.result
+
+            with Phase(server) as phase:
+                await asyncio.gather(*(coord.async_refresh() for coord in coordinators.values()))
+                await hass.async_block_till_done()
+            results["poll"] = phase.result
+
+            await hass.config_entries.async_unload(entry.entry_id)
+            await hass.async_block_till_done()
+            await hass.async_stop(force=True)
+    return results
+
+async def run(args) -> dict:
+    tracemalloc.start()
+    report = {
+        "benchmark": "fleet",
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "parameters": {
+            "latency": args.latency,
+            "jitter": args.jitter,
+            "error_rate": args.error_rate,
+            "token_ttl": args.token_ttl,
+            "poll_mode": args.poll_mode
+        },
+        "results": []
+    }
+    for size in args.sizes:
+        server = FakeTankUtilityAPI(
+            devices=size, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+            token_ttl=args.token_ttl
+        )
+        await server.start()
+        try:
+            result = {"devices": size, "client": await bench_client(server)}
+            if not args.skip_ha:
+                api.API_BASE = server.base_url
+                result.update(await bench_entry(server, size, args.poll_mode, args.timeout))
+        finally:
+            await server.stop()
+        report["results"].append(result)
+        print(json.dumps(result), file=sys.stderr)
+    return report
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the integration against the replay API.")
+    parser.add_argument("--sizes", default="1,10,100,1000", type=lambda value: [int(v) for v in value.split(",")])
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--token-ttl", type=float, default=None)
+    parser.add_argument("--poll-mode", default="per_device", choices=["per_device", "batched"])
+    parser.add_argument("--timeout", type=float, default=300.0, help="max seconds to wait for every tank's data")
+    parser.add_argument("--skip-ha", action="store_true", help="only run the client phase")
+    parser.add_argument("--output", help="write the JSON report to this file instead of stdout")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2))
+    else:
+        print(json.dumps(report, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,162 @@
+"""Local stand-in for the Tank Utility API, serving recorded payloads.
+
+Implements ``getToken``, ``devices`` and ``devices/{id}`` with configurable
+latency, error rate, token expiry and any number of synthetic devices.
+
+    python benchmarks/fake_api.py --devices 100 --latency 0.05 --port 8080
+"""
+import argparse
+import asyncio
+import base64
+import copy
+import json
+import random
+import secrets
+import time
+from collections import Counter
+
+from aiohttp import web
+
+from _loader import load_payload
+
+EMAIL = "bench@example.com"
+PASSWORD = "benchmark"
+
+def device_ids(count: int) -> list:
+    return [f"{index:06x}" + "0" * 26 for index in range(count)]
+
+class FakeTankUtilityAPI:
+    """An aiohttp application that behaves like the Tank Utility API."""
+
+    def __init__(self, devices: int = 10, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 token_ttl: float = None, reading_interval: float = None, seed: int = 0):
+        self.device_ids = device_ids(devices)
+        self._index = {device_id: index for index, device_id in enumerate(self.device_ids)}
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.token_ttl = token_ttl
+        # When set, each device's lastReading advances every ``reading_interval`` seconds.
+        self.reading_interval = reading_interval
+        self._random = random.Random(seed)
+        self._template = json.loads(load_payload("device.json"))
+        self._tokens = {}
+        self._started = time.time()
+        self.requests = Counter()
+        self.statuses = Counter()
+        self.bytes_sent = 0
+        self._runner = None
+        self.base_url = None
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/api/getToken", self._get_token)
+        app.router.add_get("/api/devices", self._devices)
+        app.router.add_get("/api/devices/{device_id}", self._device)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> str:
+        """Start serving; return the API base URL to hand to TankUtilityClient."""
+        self._runner = web.AppRunner(self.app())
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, host, port)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://{host}:{port}/api"
+        return self.base_url
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    def stats(self) -> dict:
+        return {
+            "requests": dict(self.requests),
+            "statuses": {str(status): count for status, count in self.statuses.items()},
+            "total_requests": sum(self.requests.values()),
+            "bytes_sent": self.bytes_sent
+        }
+
+    async def _respond(self, endpoint: str, status: int, payload) -> web.Response:
+        self.requests[endpoint] += 1
+        if self.latency or self.jitter:
+            await asyncio.sleep(self.latency + self._random.uniform(0, self.jitter))
+        if status == 200 and self.error_rate and self._random.random() < self.error_rate:
+            status, payload = 503, {"error": "injected failure"}
+        self.statuses[status] += 1
+        body = json.dumps(payload).encode()
+        self.bytes_sent += len(body)
+        # The real API does not always send an application/json content type.
+        return web.Response(status=status, body=body, content_type="text/html")
+
+    def _token_valid(self, request: web.Request) -> bool:
+        issued = self._tokens.get(request.query.get("token"))
+        if issued is None:
+            return False
+        return self.token_ttl is None or time.time() - issued < self.token_ttl
+
+    async def _get_token(self, request: web.Request) -> web.Response:
+        expected = "Basic " + base64.b64encode(f"{EMAIL}:{PASSWORD}".encode()).decode()
+        if request.headers.get("Authorization") != expected:
+            return await self._respond("getToken", 401, {"error": "invalid credentials"})
+        token = secrets.token_hex(16)
+        self._tokens[token] = time.time()
+        return await self._respond("getToken", 200, {"token": token})
+
+    async def _devices(self, request: web.Request) -> web.Response:
+        if not self._token_valid(request):
+            return await self._respond("devices", 401, {"error": "invalid token"})
+        return await self._respond("devices", 200, {"devices": self.device_ids})
+
+    async def _device(self, request: web.Request) -> web.Response:
+        if not self._token_valid(request):
+            return await self._respond("device", 401, {"error": "invalid token"})
+        device_id = request.match_info["device_id"]
+        if device_id not in self._index:
+            return await self._respond("device", 404, {"error": "unknown device"})
+        return await self._respond("device", 200, self.device_payload(device_id))
+
+    def device_payload(self, device_id: str) -> dict:
+        """Return the recorded payload, varied deterministically per device and reading."""
+        index = self._index[device_id]
+        payload = copy.deepcopy(self._template)
+        device = payload["device"]
+        device["name"] = f"Tank {index:04d}"
+        device["device_id"] = device_id
+        step = int((time.time() - self._started) // self.reading_interval) if self.reading_interval else 0
+        reading = device["lastReading"]
+        reading["tank"] = round(max(0.0, 90.0 - (index % 50) - step * 0.5), 1)
+        reading["temperature"] = 40.0 + index % 30
+        reading["time"] = int(self._started * 1000) + step * int((self.reading_interval or 0) * 1000)
+        return payload
+
+async def _serve(args) -> None:
+    api = FakeTankUtilityAPI(
+        devices=args.devices, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+        token_ttl=args.token_ttl, reading_interval=args.reading_interval
+    )
+    base_url = await api.start(args.host, args.port)
+    print(f"Serving {args.devices} devices at {base_url} (credentials {EMAIL} / {PASSWORD})")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await api.stop()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run a local Tank Utility API stand-in.")
+    parser.add_argument("--devices", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05, help="seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="extra random latency, up to this many seconds")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="fraction of requests answered with HTTP 503")
+    parser.add_argument("--token-ttl", type=float, default=None, help="seconds until an issued token returns 401")
+    parser.add_argument("--reading-interval", type=float, default=None, help="seconds between new readings")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    try:
+        asyncio.run(_serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
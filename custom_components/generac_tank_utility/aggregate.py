@@ -0,0 +1,100 @@
+# Account-wide fuel figures. Home Assistant-free: a coordinator listener feeds
+# every tank's new snapshot in, and the account's aggregate sensors read it.
+import heapq
+
+class FleetAggregate:
+    """Total gallons, emptiest tank and low fuel/battery counts of an account, kept incrementally.
+
+    A tank update retracts that tank's previous contribution from the running
+    sums and counts and adds the new one, so it costs O(1) plus an O(log n)
+    heap push. The emptiest tank is the top of a min-heap whose outdated
+    entries are discarded lazily when they surface.
+    Listeners are notified once per event loop iteration when ``loop`` is given,
+    so a batched poll of many tanks produces one aggregate update.
+    """
+
+    def __init__(self, loop=None):
+        self._loop = loop
+        self._tanks = {}
+        self._names = {}
+        self._heap = []
+        self._gallon_tanks = 0
+        self.total_gallons = 0.0
+        self.low_fuel = 0
+        self.low_battery = 0
+        self._listeners = []
+        self._notify_pending = False
+
+    def __len__(self) -> int:
+        return len(self._tanks)
+
+    def update(self, device_id: str, name: str, level: float, capacity, low_fuel: bool, low_battery: bool) -> None:
+        """Replace a tank's contribution with its latest level (percent), capacity (gallons) and alerts."""
+        self._retract(device_id)
+        gallons = None
+        if level is not None and isinstance(capacity, (int, float)) and capacity > 0:
+            gallons = level * capacity / 100
+            self.total_gallons += gallons
+            self._gallon_tanks += 1
+        self._tanks[device_id] = (level, gallons, low_fuel, low_battery)
+        self._names[device_id] = name
+        self.low_fuel += low_fuel
+        self.low_battery += low_battery
+        if level is not None:
+            heapq.heappush(self._heap, (level, device_id))
+            if len(self._heap) > 2 * len(self._tanks) + 16:
+                self._compact()
+        self._changed()
+
+    def remove(self, device_id: str) -> None:
+        """Drop a tank that left the account."""
+        if device_id not in self._tanks:
+            return
+        self._retract(device_id)
+        del self._tanks[device_id]
+        del self._names[device_id]
+        self._changed()
+
+    def minimum(self):
+        """Return ``(level, device_id, name)`` of the emptiest tank, or None."""
+        heap = self._heap
+        while heap:
+            level, device_id = heap[0]
+            current = self._tanks.get(device_id)
+            if current is not None and current[0] == level:
+                return level, device_id, self._names[device_id]
+            heapq.heappop(heap)
+        return None
+
+    def add_listener(self, listener):
+        """Call ``listener()`` after changes; return a function that removes it."""
+        self._listeners.append(listener)
+        return lambda: self._listeners.remove(listener)
+
+    def _retract(self, device_id: str) -> None:
+        previous = self._tanks.get(device_id)
+        if previous is None:
+            return
+        _level, gallons, low_fuel, low_battery = previous
+        if gallons is not None:
+            self._gallon_tanks -= 1
+            # Reset instead of subtracting the last tank, so float error cannot accumulate to a non-zero empty total.
+            self.total_gallons = self.total_gallons - gallons if self._gallon_tanks else 0.0
+        self.low_fuel -= low_fuel
+        self.low_battery -= low_battery
+
+    def _compact(self) -> None:
+        self._heap = [(level, device_id) for device_id, (level, *_rest) in self._tanks.items() if level is not None]
+        heapq.heapify(self._heap)
+
+    def _changed(self) -> None:
+        if self._loop is None:
+            self._notify()
+        elif not self._notify_pending:
+            self._notify_pending = True
+            self._loop.call_soon(self._notify)
+
+    def _notify(self) -> None:
+        self._notify_pending = False
+        for listener in list(self._listeners):
+            listener()
@@ -1,132 +1,93 @@
-import asyncio
-import json
 import logging
-from aiohttp import BasicAuth, ClientResponse
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
-from homeassistant.exceptions import HomeAssistantError
+import time
+from homeassistant.core import HassJob
+from homeassistant.helpers.event import async_call_later
+try:
+    from homeassistant.util.ssl import get_default_context
+except ImportError:
+    get_default_context = None
+
+# The client core is Home Assistant-free; its exceptions are re-exported for the integration's modules.
+from .client import (  # noqa: F401
+    API_BASE, TOKEN_LIFETIME, ApiUnavailable, CircuitOpen, InvalidAuth, TankUtilityApiClient, TankUtilityError
+)
 
 _LOGGER = logging.getLogger(__name__)
 
-# API endpoints for Tank Utility
-API_BASE = "https://data.tankutility.com/api"
-GET_TOKEN_ENDPOINT = f"{API_BASE}/getToken"
-DEVICES_ENDPOINT = f"{API_BASE}/devices"
-DEVICE_DATA_ENDPOINT = f"{API_BASE}/devices/{{device_id}}"
+# Proactive token refresh
+TOKEN_REFRESH_MARGIN = 0.1  # Refresh proactively once this fraction of the lifetime is left
+TOKEN_RETRY_DELAY = 300     # Seconds before retrying a failed proactive refresh
 
-class TankUtilityError(HomeAssistantError):
-    """Base exception for Tank Utility API errors."""
+def default_ssl_context():
+    """Return Home Assistant's shared SSL context, or True for aiohttp's default on older versions."""
+    return get_default_context() if get_default_context else True
 
-class InvalidAuth(TankUtilityError):
-    """Raised when authentication fails due to invalid credentials."""
+class TankUtilityClient(TankUtilityApiClient):
+    """The API client as used by the integration.
 
-class TankUtilityClient:
-    """Asynchronous client for interacting with the Tank Utility API using BasicAuth."""
+    With a ``token_store`` the token survives restarts and is refreshed in the
+    background ahead of its expected expiry, so polls do not wait on a 401 cycle.
+    Call ``async_close`` on unload.
+    """
 
-    def __init__(self, hass, email: str, password: str):
+    def __init__(self, hass, email: str, password: str, token_store=None, api_base: str = None, **kwargs):
+        # Resolved at construction so a replay server can be substituted for API_BASE.
+        super().__init__(email, password, api_base=api_base or API_BASE, **kwargs)
         self.hass = hass
-        self.email = email
-        self.password = password
-        self._token = None
-        self._lock = asyncio.Lock()
-        self._session = async_get_clientsession(hass)
+        self.ssl_context = default_ssl_context()
+        self._token_store = token_store
+        self._token_loaded = token_store is None
+        self._unsub_token_refresh = None
 
-    async def async_get_token(self, force_refresh: bool = False) -> str:
-        """Retrieve (and cache) the API token."""
-        if self._token and not force_refresh:
-            return self._token
-        async with self._lock:
-            if self._token and not force_refresh:
-                return self._token
-            _LOGGER.debug("Requesting new API token for Tank Utility")
-            try:
-                resp: ClientResponse = await self._session.get(
-                    GET_TOKEN_ENDPOINT, auth=BasicAuth(self.email, self.password)
-                )
-            except Exception as err:
-                _LOGGER.error("Error connecting to Tank Utility API for token: %s", err)
-                raise TankUtilityError("API connection error") from err
-            if resp.status == 401:
-                _LOGGER.error("Tank Utility authentication failed (HTTP 401)")
-                raise InvalidAuth("Invalid Tank Utility credentials")
-            if resp.status != 200:
-                _LOGGER.error("Token request failed, HTTP %s: %s", resp.status, await resp.text())
-                raise TankUtilityError(f"Token request failed with status {resp.status}")
-            try:
-                data = await resp.json(content_type=None)
-            except Exception as e:
-                _LOGGER.warning("JSON decode failed with unexpected mimetype, trying fallback: %s", e)
-                text = await resp.text()
-                try:
-                    data = json.loads(text)
-                except Exception as e2:
-                    _LOGGER.error("Fallback JSON decoding failed: %s", e2)
-                    raise TankUtilityError("Failed to decode token response") from e2
-            token = data.get("token")
-            if not token:
-                _LOGGER.error("No token received from Tank Utility API")
-                raise TankUtilityError("No token in response")
-            self._token = token
-            _LOGGER.debug("Obtained API token")
-            return self._token
+    async def async_close(self) -> None:
+        """Cancel the proactive token refresh and close the dedicated session (a shared one stays open)."""
+        if self._unsub_token_refresh is not None:
+            self._unsub_token_refresh()
+            self._unsub_token_refresh = None
+        await super().async_close()
 
-    async def async_list_devices(self) -> list:
-        """Retrieve the list of device IDs associated with the account."""
-        token = await self.async_get_token()
-        url = f"{DEVICES_ENDPOINT}?token={token}"
-        try:
-            resp = await self._session.get(url)
-        except Exception as err:
-            _LOGGER.error("Error fetching device list: %s", err)
-            raise TankUtilityError("API connection error") from err
-        if resp.status != 200:
-            _LOGGER.error("Failed to fetch device list, HTTP %s: %s", resp.status, await resp.text())
-            if resp.status == 401:
-                raise InvalidAuth("Token expired or invalid for device list")
-            raise TankUtilityError(f"Device list request failed with status {resp.status}")
-        try:
-            data = await resp.json(content_type=None)
-        except Exception as e:
-            _LOGGER.warning("JSON decode failed for device list, using fallback: %s", e)
-            text = await resp.text()
-            try:
-                data = json.loads(text)
-            except Exception as e2:
-                _LOGGER.error("Fallback JSON decoding for device list failed: %s", e2)
-                raise TankUtilityError("Failed to decode device list response") from e2
-        devices = data.get("devices", [])
-        _LOGGER.debug("Device list: %s", devices)
-        return devices
+    def token_info(self) -> dict:
+        return {**super().token_info(), "persisted": self._token_store is not None}
 
-    async def async_get_device_data(self, device_id: str) -> dict:
-        """Retrieve the latest data for a specific tank device."""
-        token = await self.async_get_token()
-        url = f"{DEVICE_DATA_ENDPOINT.format(device_id=device_id)}?token={token}"
-        try:
-            resp = await self._session.get(url)
-        except Exception as err:
-            _LOGGER.error("Error fetching data for device %s: %s", device_id, err)
-            raise TankUtilityError("API connection error") from err
-        if resp.status == 401:
-            _LOGGER.warning("Token expired for device %s, refreshing token", device_id)
-            await self.async_get_token(force_refresh=True)
-            resp = await self._session.get(url)
-        if resp.status != 200:
-            _LOGGER.error("Failed to fetch data for device %s (HTTP %s)", device_id, resp.status)
-            if resp.status == 401:
-                raise InvalidAuth("Unauthorized for device data")
-            raise TankUtilityError(f"Device data request failed with status {resp.status}")
+    async def _async_before_token_request(self) -> None:
+        """Restore a persisted token, if it has not expired yet."""
+        if self._token_loaded:
+            return
+        self._token_loaded = True
+        record = await self._token_store.async_load(self.email)
+        if not record:
+            return
+        self._token_lifetime = record.get("lifetime", TOKEN_LIFETIME)
+        if time.time() >= record["issued_at"] + self._token_lifetime:
+            _LOGGER.debug("Persisted API token has expired")
+            return
+        self._token = record["token"]
+        self._token_issued_at = record["issued_at"]
+        _LOGGER.debug("Restored persisted API token")
+        self._schedule_token_refresh()
+
+    async def _async_token_issued(self) -> None:
+        if self._token_store is not None:
+            await self._token_store.async_save(self.email, self._token, self._token_issued_at, self._token_lifetime)
+        self._schedule_token_refresh()
+
+    def _schedule_token_refresh(self, delay: float = None) -> None:
+        """Arm the proactive refresh shortly before the token is expected to expire."""
+        if self._token_store is None:
+            return
+        if self._unsub_token_refresh is not None:
+            self._unsub_token_refresh()
+        if delay is None:
+            refresh_at = self._token_issued_at + self._token_lifetime * (1 - TOKEN_REFRESH_MARGIN)
+            delay = max(0.0, refresh_at - time.time())
+        self._unsub_token_refresh = async_call_later(
+            self.hass, delay, HassJob(self._async_proactive_refresh, cancel_on_shutdown=True)
+        )
+
+    async def _async_proactive_refresh(self, _now) -> None:
+        self._unsub_token_refresh = None
         try:
-            raw_data = await resp.json(content_type=None)
-        except Exception as e:
-            _LOGGER.warning("JSON decode failed for device data, using fallback: %s", e)
-            text = await resp.text()
-            try:
-                raw_data = json.loads(text)
-            except Exception as e2:
-                _LOGGER.error("Fallback JSON decoding for device data failed: %s", e2)
-                raise TankUtilityError("Failed to decode device data response") from e2
-        device_info = raw_data.get("device", {})
-        last_reading = device_info.pop("lastReading", {}) if isinstance(device_info, dict) else {}
-        data = {**device_info, **last_reading}
-        _LOGGER.debug("Fetched data for device %s: %s", device_id, data)
-        return data
+            await self.async_get_token(force_refresh=True, stale_token=self._token)
+        except TankUtilityError as err:
+            _LOGGER.warning("Proactive token refresh failed, retrying in %ss: %s", TOKEN_RETRY_DELAY, err)
+            self._schedule_token_refresh(TOKEN_RETRY_DELAY)
@@ -0,0 +1,341 @@
+# Tank Utility API client core. Home Assistant-free: it runs on any asyncio loop
+# with a plain aiohttp session, for batch jobs and tools; api.py adds token
+# persistence and proactive refresh on top for the integration.
+import asyncio
+import logging
+import time
+import aiohttp
+from aiohttp import BasicAuth, ClientTimeout, TCPConnector, TraceConfig
+
+from .metrics import ApiMetrics
+from .models import TankReading, decode_json
+from .resilience import CircuitBreaker, FairLimiter, TokenBucket, backoff_delay, parse_retry_after
+
+_LOGGER = logging.getLogger(__name__)
+
+# API endpoints for Tank Utility
+API_BASE = "https://data.tankutility.com/api"
+GET_TOKEN_ENDPOINT = "{api_base}/getToken"
+DEVICES_ENDPOINT = "{api_base}/devices"
+DEVICE_DATA_ENDPOINT = "{api_base}/devices/{device_id}"
+
+# Connection pool tuning for the client's dedicated session
+POOL_LIMIT = 32             # Total simultaneous connections
+POOL_LIMIT_PER_HOST = 8     # All requests go to one host; keep it bounded
+KEEPALIVE_TIMEOUT = 60      # Seconds an idle connection is kept for reuse
+DNS_CACHE_TTL = 300         # Seconds a resolved address is cached
+CONNECT_TIMEOUT = 10        # Seconds to establish a connection (incl. TLS)
+READ_TIMEOUT = 30           # Seconds to wait between reads of the response
+
+# Token lifetime tracking
+TOKEN_LIFETIME = 86400      # Assumed lifetime (seconds) of a token until a rejection teaches us otherwise
+MIN_TOKEN_LIFETIME = 3600   # Never assume a token lives shorter than this
+
+# Failure handling
+RETRY_ATTEMPTS = 2          # Extra attempts for a request that hit a 5xx, 429 or connection error
+RETRY_BASE_DELAY = 1.0      # Seconds; the backoff ceiling doubles with every attempt
+RETRY_MAX_DELAY = 30.0      # Longest wait before a retry; a longer Retry-After opens the circuit instead
+BREAKER_FAILURE_THRESHOLD = 5   # Consecutive failed requests that open the circuit
+BREAKER_RESET_TIMEOUT = 60      # Seconds the circuit stays open before a probe request
+BREAKER_MAX_RESET_TIMEOUT = 3600  # Upper bound for the doubling open period
+RATE_LIMIT = 10.0           # Average requests per second
+RATE_BURST = 20             # Requests that may be sent back to back
+
+def create_session(stats: dict, ssl=True, limit_per_host: int = POOL_LIMIT_PER_HOST) -> aiohttp.ClientSession:
+    """Create a keep-alive session tuned for this API, counting connection events into ``stats``."""
+    def _counter(key: str):
+        async def _count(session, context, params):
+            stats[key] = stats.get(key, 0) + 1
+        return _count
+
+    trace_config = TraceConfig()
+    trace_config.on_connection_create_end.append(_counter("connections_created"))
+    trace_config.on_connection_reuseconn.append(_counter("connections_reused"))
+    trace_config.on_dns_cache_hit.append(_counter("dns_cache_hits"))
+    trace_config.on_dns_cache_miss.append(_counter("dns_cache_misses"))
+    connector = TCPConnector(
+        limit=max(POOL_LIMIT, limit_per_host),
+        limit_per_host=limit_per_host,
+        keepalive_timeout=KEEPALIVE_TIMEOUT,
+        ttl_dns_cache=DNS_CACHE_TTL,
+        ssl=ssl
+    )
+    return aiohttp.ClientSession(
+        connector=connector,
+        timeout=ClientTimeout(total=None, connect=CONNECT_TIMEOUT, sock_read=READ_TIMEOUT),
+        trace_configs=[trace_config]
+    )
+
+class TankUtilityError(Exception):
+    """Base exception for Tank Utility API errors."""
+
+class InvalidAuth(TankUtilityError):
+    """Raised when authentication fails due to invalid credentials."""
+
+class ApiUnavailable(TankUtilityError):
+    """Raised on server errors, rate limiting and connection failures."""
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class CircuitOpen(ApiUnavailable):
+    """Raised without sending a request while the account's circuit is open."""
+
+class TankUtilityApiClient:
+    """Asynchronous client for the Tank Utility API using BasicAuth, without Home Assistant.
+
+    Requests go through ``session`` when one is passed (it is left open), or
+    else through a dedicated keep-alive session whose connection pool, DNS
+    cache and timeouts are tuned for this API; call ``async_close`` when done.
+    The token is kept in memory and re-requested once when it is rejected.
+    Pass ``metrics`` to record per-call timings, statuses, retries and bytes.
+
+    Transient failures are retried with jittered exponential backoff, honoring
+    Retry-After; repeated failures open the account's circuit breaker, and every
+    request takes a ``request_limiter`` slot and draws from ``rate_limiter`` first.
+    Share one session and both limiters between clients to budget many accounts together.
+    """
+
+    # Passed to the dedicated session; True is aiohttp's default verification.
+    ssl_context = True
+
+    def __init__(self, email: str, password: str, session: aiohttp.ClientSession = None, api_base: str = None,
+                 metrics: ApiMetrics = None, rate_limiter: TokenBucket = None, request_limiter: FairLimiter = None):
+        self.metrics = metrics
+        self.breaker = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT, BREAKER_MAX_RESET_TIMEOUT)
+        self.rate_limiter = rate_limiter or TokenBucket(RATE_LIMIT, RATE_BURST)
+        self.request_limiter = request_limiter or FairLimiter(POOL_LIMIT_PER_HOST)
+        self.api_base = api_base or API_BASE
+        self.email = email
+        self.password = password
+        self._token = None
+        self._token_issued_at = None
+        self._token_lifetime = TOKEN_LIFETIME
+        self._lock = asyncio.Lock()
+        self._session = None
+        self._shared_session = session
+        self._in_flight = 0
+        self._pool_stats = {"requests": 0}
+        if session is None:
+            self._pool_stats.update(connections_created=0, connections_reused=0, dns_cache_hits=0, dns_cache_misses=0)
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, or the client's own, creating it on first use."""
+        if self._shared_session is not None:
+            return self._shared_session
+        if self._session is None or self._session.closed:
+            self._session = create_session(self._pool_stats, self.ssl_context)
+        return self._session
+
+    async def async_close(self) -> None:
+        """Close the dedicated session (a shared one stays open)."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def pool_statistics(self) -> dict:
+        """Return connection pool counters for diagnostics."""
+        stats = {**self._pool_stats, "in_flight": self._in_flight, "shared": self._shared_session is not None}
+        session = self._shared_session or self._session
+        connector = session.connector if session is not None else None
+        if connector is not None:
+            stats["limit"] = connector.limit
+            stats["limit_per_host"] = connector.limit_per_host
+        return stats
+
+    async def _async_request(self, url: str, description: str, params: dict = None, auth: BasicAuth = None,
+                             operation: str = None) -> dict:
+        """Perform a GET through the circuit breaker, retrying transient failures with backoff.
+
+        Raises CircuitOpen without sending anything while the circuit is open.
+        """
+        attempt = 0
+        while True:
+            if not self.breaker.allow_request():
+                raise CircuitOpen(
+                    f"Tank Utility API unavailable, skipped {description}", retry_after=self.breaker.retry_in()
+                )
+            try:
+                result = await self._async_send(url, description, params, auth, operation)
+            except ApiUnavailable as err:
+                self.breaker.record_failure()
+                if err.retry_after is not None and err.retry_after > RETRY_MAX_DELAY:
+                    self.breaker.open(err.retry_after)
+                if attempt >= RETRY_ATTEMPTS or self.breaker.rejecting():
+                    _LOGGER.error("%s request failed after %d attempt(s): %s", description, attempt + 1, err)
+                    raise
+                delay = err.retry_after if err.retry_after is not None else backoff_delay(
+                    attempt, RETRY_BASE_DELAY, RETRY_MAX_DELAY
+                )
+                attempt += 1
+                if self.metrics is not None and operation:
+                    self.metrics.operation(operation).retries += 1
+                _LOGGER.debug("Retrying %s in %.1fs after: %s", description, delay, err)
+                await asyncio.sleep(delay)
+                continue
+            except TankUtilityError:
+                # The API answered, even if with an error of ours.
+                self.breaker.record_success()
+                raise
+            except asyncio.CancelledError:
+                self.breaker.release_probe()
+                raise
+            self.breaker.record_success()
+            return result
+
+    async def _async_send(self, url: str, description: str, params: dict, auth: BasicAuth, operation: str) -> dict:
+        """Send one GET and return the decoded JSON body.
+
+        The body is read once as bytes and parsed once. The response is always
+        released back to the pool, on success and on every error path.
+        Raises InvalidAuth on HTTP 401, ApiUnavailable on 429, 5xx and connection
+        errors, and TankUtilityError otherwise. The limiter slot is taken before the
+        rate token so the queue order, fair across accounts, decides who goes next.
+        """
+        async with self.request_limiter.slot(self.email.lower()):
+            await self.rate_limiter.acquire()
+            session = self._get_session()
+            metrics = self.metrics.operation(operation) if self.metrics is not None and operation else None
+            started = time.monotonic() if metrics is not None else 0.0
+            self._pool_stats["requests"] += 1
+            self._in_flight += 1
+            try:
+                async with session.get(url, params=params, auth=auth) as resp:
+                    if metrics is not None:
+                        metrics.statuses[resp.status] += 1
+                    if resp.status == 401:
+                        raise InvalidAuth(f"Unauthorized for {description}")
+                    body = await resp.read()
+                    if metrics is not None:
+                        metrics.bytes_received += len(body)
+                    if resp.status == 429 or resp.status >= 500:
+                        raise ApiUnavailable(
+                            f"{description} request failed with status {resp.status}",
+                            retry_after=parse_retry_after(resp.headers.get("Retry-After"))
+                        )
+                    if resp.status != 200:
+                        _LOGGER.error(
+                            "%s request failed, HTTP %s: %s", description, resp.status, body.decode(errors="replace")
+                        )
+                        raise TankUtilityError(f"{description} request failed with status {resp.status}")
+                try:
+                    return decode_json(body)
+                except ValueError as err:
+                    if metrics is not None:
+                        metrics.errors["decode"] += 1
+                    _LOGGER.error("JSON decoding for %s failed (%d bytes): %s", description, len(body), err)
+                    raise TankUtilityError(f"Failed to decode {description} response") from err
+            except (aiohttp.ClientError, asyncio.TimeoutError) as err:
+                if metrics is not None:
+                    metrics.errors["timeout" if isinstance(err, asyncio.TimeoutError) else "connection"] += 1
+                raise ApiUnavailable(f"API connection error: {err or type(err).__name__}") from err
+            finally:
+                self._in_flight -= 1
+                if metrics is not None:
+                    metrics.observe(time.monotonic() - started)
+
+    def token_info(self) -> dict:
+        """Return token age and expected lifetime for diagnostics (never the token itself)."""
+        return {
+            "has_token": self._token is not None,
+            "age": round(time.time() - self._token_issued_at, 1) if self._token_issued_at else None,
+            "expected_lifetime": self._token_lifetime
+        }
+
+    def _token_expired(self) -> bool:
+        if self._token_issued_at is None:
+            return False
+        return time.time() >= self._token_issued_at + self._token_lifetime
+
+    async def async_get_token(self, force_refresh: bool = False, stale_token: str = None) -> str:
+        """Return a valid API token, refreshing it at most once for concurrent callers.
+
+        With ``force_refresh`` and ``stale_token``, the token is only re-requested if
+        nobody has replaced ``stale_token`` in the meantime (single-flight).
+        """
+        if self._token and not force_refresh and not self._token_expired():
+            return self._token
+        async with self._lock:
+            await self._async_before_token_request()
+            if self._token and not self._token_expired():
+                if not force_refresh or (stale_token is not None and self._token != stale_token):
+                    return self._token
+            return await self._async_request_token()
+
+    async def _async_before_token_request(self) -> None:
+        """Called under the token lock before a token is (re)requested; a subclass may restore one."""
+
+    async def _async_request_token(self) -> str:
+        _LOGGER.debug("Requesting new API token for Tank Utility")
+        try:
+            data = await self._async_request(
+                GET_TOKEN_ENDPOINT.format(api_base=self.api_base), "token", auth=BasicAuth(self.email, self.password),
+                operation="token"
+            )
+        except InvalidAuth as err:
+            _LOGGER.error("Tank Utility authentication failed (HTTP 401)")
+            raise InvalidAuth("Invalid Tank Utility credentials") from err
+        token = data.get("token")
+        if not token:
+            _LOGGER.error("No token received from Tank Utility API")
+            raise TankUtilityError("No token in response")
+        self._token = token
+        self._token_issued_at = time.time()
+        _LOGGER.debug("Obtained API token")
+        await self._async_token_issued()
+        return self._token
+
+    async def _async_token_issued(self) -> None:
+        """Called after a new token was obtained; a subclass may persist it."""
+
+    def _note_token_rejected(self, token: str) -> None:
+        """Shorten the expected lifetime when a token is rejected before we expected."""
+        if token != self._token or self._token_issued_at is None:
+            return
+        age = time.time() - self._token_issued_at
+        if age < self._token_lifetime:
+            self._token_lifetime = max(age, MIN_TOKEN_LIFETIME)
+            _LOGGER.debug("Token rejected after %.0fs; expected lifetime now %.0fs", age, self._token_lifetime)
+
+    async def _async_authorized_request(self, url: str, description: str, rejected_message: str,
+                                        operation: str = None) -> dict:
+        """Perform a token-authenticated request, refreshing the token once on HTTP 401.
+
+        If the refreshed token is rejected too, InvalidAuth is raised with
+        ``rejected_message``. Credential failures from getToken pass through unchanged.
+        """
+        token = await self.async_get_token()
+        try:
+            return await self._async_request(url, description, params={"token": token}, operation=operation)
+        except InvalidAuth:
+            _LOGGER.warning("Token rejected for %s, refreshing token", description)
+            if self.metrics is not None and operation:
+                self.metrics.operation(operation).retries += 1
+            self._note_token_rejected(token)
+        token = await self.async_get_token(force_refresh=True, stale_token=token)
+        try:
+            return await self._async_request(url, description, params={"token": token}, operation=operation)
+        except InvalidAuth as err:
+            _LOGGER.error("Failed to fetch %s (HTTP 401)", description)
+            raise InvalidAuth(rejected_message) from err
+
+    async def async_list_devices(self) -> list:
+        """Retrieve the list of device IDs associated with the account."""
+        data = await self._async_authorized_request(
+            DEVICES_ENDPOINT.format(api_base=self.api_base), "device list", "Token expired or invalid for device list",
+            operation="device_list"
+        )
+        devices = data.get("devices", [])
+        _LOGGER.debug("Device list: %s", devices)
+        return devices
+
+    async def async_get_device_data(self, device_id: str) -> TankReading:
+        """Retrieve the latest reading for a specific tank device."""
+        url = DEVICE_DATA_ENDPOINT.format(api_base=self.api_base, device_id=device_id)
+        raw_data = await self._async_authorized_request(
+            url, f"device {device_id} data", "Unauthorized for device data", operation="device_data"
+        )
+        reading = TankReading.from_payload(raw_data)
+        _LOGGER.debug("Fetched data for device %s: %s", device_id, reading)
+        return reading
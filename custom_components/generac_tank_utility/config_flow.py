@@ -1,4 +1,6 @@
+import asyncio
 import logging
+import time
 import voluptuous as vol
 
 from homeassistant import config_entries
@@ -6,18 +8,59 @@ from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 
 from . import api
+from .token_store import async_get_token_store
 from .const import (
     DOMAIN,
     CONF_EMAIL,
     CONF_PASSWORD,
     CONF_DEVICES,
     DEFAULT_SCAN_INTERVAL,
+    MIN_SCAN_INTERVAL,
     CONF_ENABLE_MQTT,
-    DEFAULT_ENABLE_MQTT
+    DEFAULT_ENABLE_MQTT,
+    CONF_MQTT_PER_FIELD,
+    CONF_MQTT_DISCOVERY,
+    DEFAULT_MQTT_PER_FIELD,
+    DEFAULT_MQTT_DISCOVERY,
+    CONF_POLL_MODE,
+    CONF_MAX_CONCURRENCY,
+    CONF_REFRESH_TIMEOUT,
+    DEFAULT_POLL_MODE,
+    DEFAULT_MAX_CONCURRENCY,
+    DEFAULT_REFRESH_TIMEOUT,
+    POLL_MODE_PER_DEVICE,
+    POLL_MODE_BATCHED,
+    CONF_POLL_STRATEGY,
+    DEFAULT_POLL_STRATEGY,
+    POLL_STRATEGY_FIXED,
+    POLL_STRATEGY_ADAPTIVE,
+    CONF_ENABLE_INSTRUMENTATION,
+    DEFAULT_ENABLE_INSTRUMENTATION
 )
 
 _LOGGER = logging.getLogger(__name__)
 
+async def _async_fetch_device_data(client: api.TankUtilityClient, device_ids: list) -> dict:
+    """Fetch every device's reading concurrently, at most DEFAULT_MAX_CONCURRENCY at a time."""
+    semaphore = asyncio.Semaphore(DEFAULT_MAX_CONCURRENCY)
+
+    async def _fetch(dev_id):
+        async with semaphore:
+            try:
+                return await client.async_get_device_data(dev_id)
+            except api.InvalidAuth:
+                raise
+            except Exception as err:
+                _LOGGER.warning("Could not fetch data for device %s: %s", dev_id, err)
+                return None
+
+    # Let every fetch finish before raising, so none is still running when the caller closes the session.
+    results = await asyncio.gather(*(_fetch(dev_id) for dev_id in device_ids), return_exceptions=True)
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        raise next((err for err in errors if isinstance(err, api.InvalidAuth)), errors[0])
+    return {dev_id: reading for dev_id, reading in zip(device_ids, results) if reading is not None}
+
 class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     """Handle a config flow for Generac Tank Utility integration."""
     VERSION = 1
@@ -28,9 +71,18 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         if user_input is not None:
             email = user_input.get(CONF_EMAIL)
             password = user_input.get(CONF_PASSWORD)
-            client = api.TankUtilityClient(self.hass, email, password)
+            client = api.TankUtilityClient(self.hass, email, password, token_store=async_get_token_store(self.hass))
             try:
+                # Always validate the credentials; the fresh token is persisted for async_setup_entry to reuse.
+                await client.async_get_token(force_refresh=True)
                 devices = await client.async_list_devices()
+                _LOGGER.info("Authenticated successfully; found %d devices", len(devices))
+                readings = await _async_fetch_device_data(client, devices)
+                device_list = []
+                for dev_id in devices:
+                    reading = readings.get(dev_id)
+                    name = reading.get("name") if reading else None
+                    device_list.append({"id": dev_id, "name": name or f"Tank {dev_id[:6]}"})
             except api.InvalidAuth:
                 errors["base"] = "invalid_auth"
                 _LOGGER.warning("Invalid credentials provided for Tank Utility")
@@ -38,16 +90,6 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 errors["base"] = "cannot_connect"
                 _LOGGER.error("Error connecting to Tank Utility API: %s", err)
             else:
-                _LOGGER.info("Authenticated successfully; found %d devices", len(devices))
-                device_list = []
-                for dev_id in devices:
-                    try:
-                        data = await client.async_get_device_data(dev_id)
-                    except Exception as err:
-                        _LOGGER.warning("Could not fetch data for device %s: %s", dev_id, err)
-                        data = {"id": dev_id, "name": dev_id}
-                    name = data.get("name", f"Tank {dev_id[:6]}")
-                    device_list.append({"id": dev_id, "name": name})
                 await self.async_set_unique_id(email.lower())
                 self._abort_if_unique_id_configured()
                 entry_data = {
@@ -56,7 +98,14 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     CONF_DEVICES: device_list
                 }
                 _LOGGER.debug("Creating config entry with data: %s", entry_data)
+                # Setup seeds its coordinators from these readings instead of fetching every tank again.
+                self.hass.data.setdefault(DOMAIN, {}).setdefault("discovery", {})[email.lower()] = {
+                    "fetched_at": time.monotonic(),
+                    "readings": readings
+                }
                 return self.async_create_entry(title=f"Tank Utility ({email})", data=entry_data)
+            finally:
+                await client.async_close()
         schema = vol.Schema({
             vol.Required(CONF_EMAIL): str,
             vol.Required(CONF_PASSWORD): str
@@ -76,10 +125,10 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
             )
         email = user_input.get(CONF_EMAIL)
         password = user_input.get(CONF_PASSWORD)
-        client = api.TankUtilityClient(self.hass, email, password)
+        client = api.TankUtilityClient(self.hass, email, password, token_store=async_get_token_store(self.hass))
         errors = {}
         try:
-            await client.async_get_token()
+            await client.async_get_token(force_refresh=True)
         except api.InvalidAuth:
             errors["base"] = "invalid_auth"
             _LOGGER.warning("Reauthentication failed: invalid credentials")
@@ -102,6 +151,8 @@ class ConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 }),
                 errors=errors
             )
+        finally:
+            await client.async_close()
         entry = self.hass.config_entries.async_get_entry(self.context.get("entry_id"))
         if entry:
             new_data = {**entry.data, CONF_EMAIL: email, CONF_PASSWORD: password}
@@ -130,8 +181,32 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         for device in devices:
             dev_id = device["id"]
             default_interval = stored_options.get(f"interval_{dev_id}", DEFAULT_SCAN_INTERVAL)
-            schema_fields[vol.Required(f"interval_{dev_id}", default=default_interval)] = int
-        # MQTT option is not user configurable at this time.
-        schema_fields[vol.Optional(CONF_ENABLE_MQTT, default=False)] = bool
-        _LOGGER.debug("MQTT option is coming soon and is not user-configurable at this time.")
+            schema_fields[vol.Required(f"interval_{dev_id}", default=default_interval)] = vol.All(
+                int, vol.Range(min=MIN_SCAN_INTERVAL)
+            )
+        schema_fields[vol.Optional(
+            CONF_POLL_MODE, default=stored_options.get(CONF_POLL_MODE, DEFAULT_POLL_MODE)
+        )] = vol.In([POLL_MODE_PER_DEVICE, POLL_MODE_BATCHED])
+        schema_fields[vol.Optional(
+            CONF_POLL_STRATEGY, default=stored_options.get(CONF_POLL_STRATEGY, DEFAULT_POLL_STRATEGY)
+        )] = vol.In([POLL_STRATEGY_FIXED, POLL_STRATEGY_ADAPTIVE])
+        schema_fields[vol.Optional(
+            CONF_MAX_CONCURRENCY, default=stored_options.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY)
+        )] = vol.All(int, vol.Range(min=1, max=64))
+        schema_fields[vol.Optional(
+            CONF_REFRESH_TIMEOUT, default=stored_options.get(CONF_REFRESH_TIMEOUT, DEFAULT_REFRESH_TIMEOUT)
+        )] = vol.All(int, vol.Range(min=5, max=300))
+        schema_fields[vol.Optional(
+            CONF_ENABLE_MQTT, default=stored_options.get(CONF_ENABLE_MQTT, DEFAULT_ENABLE_MQTT)
+        )] = bool
+        schema_fields[vol.Optional(
+            CONF_MQTT_PER_FIELD, default=stored_options.get(CONF_MQTT_PER_FIELD, DEFAULT_MQTT_PER_FIELD)
+        )] = bool
+        schema_fields[vol.Optional(
+            CONF_MQTT_DISCOVERY, default=stored_options.get(CONF_MQTT_DISCOVERY, DEFAULT_MQTT_DISCOVERY)
+        )] = bool
+        schema_fields[vol.Optional(
+            CONF_ENABLE_INSTRUMENTATION,
+            default=stored_options.get(CONF_ENABLE_INSTRUMENTATION, DEFAULT_ENABLE_INSTRUMENTATION)
+        )] = bool
         return self.async_show_form(step_id="init", data_schema=vol.Schema(schema_fields))
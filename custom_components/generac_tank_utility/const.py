@@ -5,11 +5,61 @@ CONF_EMAIL = "email"
 CONF_PASSWORD = "password"
 CONF_DEVICES = "devices"          # List of tank devices (IDs and names)
 # CONF_INTERVALS is no longer used.
-CONF_ENABLE_MQTT = "enable_mqtt"  # Option to enable MQTT publishing (Coming Soon)
+CONF_ENABLE_MQTT = "enable_mqtt"  # Option to enable MQTT publishing
+CONF_MQTT_PER_FIELD = "mqtt_per_field"  # Also publish each field to its own topic
+CONF_MQTT_DISCOVERY = "mqtt_discovery"  # Publish retained MQTT discovery configs
+CONF_POLL_MODE = "poll_mode"      # "per_device" (one refresh per tank) or "batched" (one cycle per account)
+CONF_POLL_STRATEGY = "poll_strategy"  # "fixed" (per-tank interval) or "adaptive" (follow the reporting cadence)
+CONF_MAX_CONCURRENCY = "max_concurrency"  # Max simultaneous device requests (batched polls and startup)
+CONF_REFRESH_TIMEOUT = "refresh_timeout"  # Per-device timeout (seconds) for a single fetch
+CONF_ENABLE_INSTRUMENTATION = "enable_instrumentation"  # Record API timings and add account diagnostic sensors
+
+# Polling modes
+POLL_MODE_PER_DEVICE = "per_device"
+POLL_MODE_BATCHED = "batched"
+
+# Polling strategies
+POLL_STRATEGY_FIXED = "fixed"
+POLL_STRATEGY_ADAPTIVE = "adaptive"
 
 # Default settings
 DEFAULT_SCAN_INTERVAL = 21600  # 6 hours (in seconds) as default polling interval per tank
+MIN_SCAN_INTERVAL = 60  # Lower bound for a per-tank interval (seconds)
+MAX_STAGGER = 900  # Upper bound (seconds) of the deterministic per-tank start offset
+ADAPTIVE_GRACE = 120  # Poll this long (seconds) after a reading is expected, giving the cloud time to ingest it
+ADAPTIVE_BACKOFF_BASE = 300  # First retry delay (seconds) when the expected reading has not arrived yet
+ADAPTIVE_MAX_DELAY = 86400  # Never wait longer than this (seconds) between adaptive polls
 DEFAULT_ENABLE_MQTT = False
+DEFAULT_MQTT_PER_FIELD = False
+DEFAULT_MQTT_DISCOVERY = False
+MQTT_MAX_PENDING = 1000  # Devices waiting to be published before the oldest is dropped
+DEFAULT_POLL_MODE = POLL_MODE_PER_DEVICE
+DEFAULT_POLL_STRATEGY = POLL_STRATEGY_FIXED
+DEFAULT_MAX_CONCURRENCY = 8
+DEFAULT_REFRESH_TIMEOUT = 30
+DEFAULT_ENABLE_INSTRUMENTATION = False
+DISCOVERY_CACHE_TTL = 600  # Seconds the config flow's readings may seed a new entry's coordinators
+STARTUP_RETRY_DELAY = 300  # First background retry (seconds) for a tank that failed its first refresh
+REDISCOVERY_INTERVAL = 86400  # Seconds between checks of the account's device list for added or removed tanks
+REFRESH_COALESCE_WINDOW = 30  # Seconds a finished on-demand refresh also answers new refresh requests for that tank
+
+# Services
+SERVICE_REFRESH = "refresh"
+ATTR_DEVICE_ID = "device_id"
+ATTR_CONFIG_ENTRY_ID = "config_entry_id"
+ATTR_TANK_ID = "tank_id"  # A Tank Utility device id, as opposed to a Home Assistant device registry id
+SERVICE_EXPORT = "export"
+EXPORT_DIRECTORY = f"{DOMAIN}_exports"  # Under the config dir
+EXPORT_PROGRESS_INTERVAL = 1.0  # Minimum seconds between export progress events
+
+# Events
+EVENT_EXPORT_PROGRESS = f"{DOMAIN}_export_progress"
+EVENT_EXPORT_COMPLETED = f"{DOMAIN}_export_completed"
+
+# Dispatcher signal (formatted with the entry ID) carrying newly discovered devices to the platforms
+SIGNAL_DEVICES_ADDED = "generac_tank_utility_devices_added_{}"
+
+PLATFORMS = ["sensor", "binary_sensor"]
 
 # Thresholds for binary sensor alerts (in percentage)
 LOW_FUEL_THRESHOLD = 20
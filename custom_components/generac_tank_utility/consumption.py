@@ -0,0 +1,200 @@
+# Fleet-wide burn-rate estimation. Home Assistant-free: the model is fed readings
+# by a coordinator listener and read by the consumption sensor entities.
+import numpy as np
+
+from .const import LOW_FUEL_THRESHOLD
+
+SECONDS_PER_DAY = 86400.0
+CONSUMPTION_WINDOW = 42     # Readings per tank in the rolling regression window
+MIN_POINTS = 3              # Readings needed before a rate is reported
+REFILL_THRESHOLD = 10.0     # A rise of this many percentage points is treated as a refill
+
+class FleetConsumptionModel:
+    """Least-squares fuel level trend for every tank, maintained incrementally.
+
+    Each tank keeps a ring buffer of its last readings plus running sums of t, y,
+    t² and t·y, so adding a reading is O(1). Tanks with new readings are marked
+    dirty and their slopes are solved together in one vectorized pass, once per
+    event loop iteration when ``loop`` is given, after which the tanks' listeners
+    are notified; estimates are cached until the tank's next reading.
+    The per-tank arrays grow geometrically as tanks are added.
+    A jump of ``REFILL_THRESHOLD`` points records a refill and restarts the window.
+    """
+
+    def __init__(self, window: int = CONSUMPTION_WINDOW, loop=None):
+        self.window = window
+        self._loop = loop
+        self._slots = {}
+        self._origin = None
+        self._times = np.zeros((0, window))
+        self._levels = np.zeros((0, window))
+        self._head = np.zeros(0, dtype=np.int64)
+        self._count = np.zeros(0, dtype=np.int64)
+        # Running sums per tank: t, y, t², t·y
+        self._sums = np.zeros((0, 4))
+        self._last_time = np.full(0, np.nan)
+        self._last_level = np.full(0, np.nan)
+        self._capacity = np.full(0, np.nan)
+        self._slopes = np.full(0, np.nan)
+        self._refills = {}
+        # Tanks with readings not yet solved, and solved tanks whose listeners are not yet notified.
+        self._dirty = {}
+        self._unnotified = {}
+        self._estimates = {}
+        self._listeners = {}
+        self._flush_pending = False
+
+    def _grow(self, size: int) -> None:
+        """Enlarge every per-tank array to ``size`` rows, keeping their contents."""
+        def _resize(array, fill):
+            grown = np.full((size,) + array.shape[1:], fill, dtype=array.dtype)
+            grown[:len(array)] = array
+            return grown
+
+        self._times = _resize(self._times, 0.0)
+        self._levels = _resize(self._levels, 0.0)
+        self._head = _resize(self._head, 0)
+        self._count = _resize(self._count, 0)
+        self._sums = _resize(self._sums, 0.0)
+        self._last_time = _resize(self._last_time, np.nan)
+        self._last_level = _resize(self._last_level, np.nan)
+        self._capacity = _resize(self._capacity, np.nan)
+        self._slopes = _resize(self._slopes, np.nan)
+
+    def _slot(self, device_id: str) -> int:
+        slot = self._slots.get(device_id)
+        if slot is None:
+            slot = self._slots[device_id] = len(self._slots)
+            if slot == len(self._head):
+                self._grow(max(16, 2 * slot))
+        return slot
+
+    def add(self, device_id: str, timestamp: float, level: float, capacity: float = None) -> bool:
+        """Add one reading (epoch seconds, percent full); return False if it is not newer."""
+        slot = self._slot(device_id)
+        if capacity:
+            self._capacity[slot] = capacity
+            self._estimates.pop(device_id, None)
+        if self._origin is None:
+            self._origin = timestamp
+        if not np.isnan(self._last_time[slot]) and timestamp <= self._last_time[slot]:
+            return False
+        previous = self._last_level[slot]
+        if not np.isnan(previous) and level - previous >= REFILL_THRESHOLD:
+            self._refills.setdefault(device_id, []).append((timestamp, float(previous), float(level)))
+            self._count[slot] = 0
+            self._head[slot] = 0
+            self._sums[slot] = 0.0
+        t = (timestamp - self._origin) / SECONDS_PER_DAY
+        head = self._head[slot]
+        if self._count[slot] == self.window:
+            old_t, old_y = self._times[slot, head], self._levels[slot, head]
+            self._sums[slot] -= (old_t, old_y, old_t * old_t, old_t * old_y)
+        else:
+            self._count[slot] += 1
+        self._times[slot, head] = t
+        self._levels[slot, head] = level
+        self._sums[slot] += (t, level, t * t, t * level)
+        self._head[slot] = (head + 1) % self.window
+        self._last_time[slot] = timestamp
+        self._last_level[slot] = level
+        self._changed(device_id, slot)
+        return True
+
+    def add_many(self, device_id: str, timestamps, levels) -> None:
+        """Add a tank's stored readings (oldest first) in one vectorized step, as repeated ``add`` would."""
+        slot = self._slot(device_id)
+        times = np.asarray(timestamps, dtype=float)
+        values = np.asarray(levels, dtype=float)
+        if self._count[slot] or not np.isnan(self._last_time[slot]) or len(times) == 0:
+            for timestamp, level in zip(times, values):
+                self.add(device_id, float(timestamp), float(level))
+            return
+        newer = np.concatenate(([True], np.diff(times) > 0))
+        times, values = times[newer], values[newer]
+        if self._origin is None:
+            self._origin = float(times[0])
+        jumps = np.nonzero(np.diff(values) >= REFILL_THRESHOLD)[0] + 1
+        if len(jumps):
+            self._refills.setdefault(device_id, []).extend(
+                (float(times[index]), float(values[index - 1]), float(values[index])) for index in jumps
+            )
+        start = max(int(jumps[-1]) if len(jumps) else 0, len(times) - self.window)
+        t = (times[start:] - self._origin) / SECONDS_PER_DAY
+        y = values[start:]
+        count = len(t)
+        self._times[slot, :count] = t
+        self._levels[slot, :count] = y
+        self._count[slot] = count
+        self._head[slot] = count % self.window
+        self._sums[slot] = (t.sum(), y.sum(), (t * t).sum(), (t * y).sum())
+        self._last_time[slot] = times[-1]
+        self._last_level[slot] = values[-1]
+        self._changed(device_id, slot)
+
+    def add_listener(self, device_id: str, listener):
+        """Call ``listener()`` after a tank's estimate changed; return a function that removes it."""
+        listeners = self._listeners.setdefault(device_id, [])
+        listeners.append(listener)
+        return lambda: listeners.remove(listener)
+
+    def _changed(self, device_id: str, slot: int) -> None:
+        self._dirty[device_id] = slot
+        self._estimates.pop(device_id, None)
+        if self._loop is None:
+            self._flush()
+        elif not self._flush_pending:
+            self._flush_pending = True
+            self._loop.call_soon(self._flush)
+
+    def _solve(self) -> None:
+        """Solve the regression slope (percent per day) of every dirty tank in one vectorized pass."""
+        if not self._dirty:
+            return
+        slots = np.fromiter(self._dirty.values(), dtype=np.int64, count=len(self._dirty))
+        n = self._count[slots].astype(float)
+        sum_t, sum_y, sum_tt, sum_ty = self._sums[slots].T
+        denominator = n * sum_tt - sum_t * sum_t
+        valid = (n >= MIN_POINTS) & (denominator > 1e-9)
+        slopes = np.full(len(slots), np.nan)
+        np.divide(n * sum_ty - sum_t * sum_y, denominator, out=slopes, where=valid)
+        self._slopes[slots] = slopes
+        self._unnotified.update(self._dirty)
+        self._dirty = {}
+
+    def _flush(self) -> None:
+        self._flush_pending = False
+        self._solve()
+        unnotified, self._unnotified = self._unnotified, {}
+        for device_id in unnotified:
+            for listener in list(self._listeners.get(device_id, ())):
+                listener()
+
+    def estimate(self, device_id: str) -> dict:
+        """Return the current burn rate, days to the low-fuel threshold and refill history."""
+        estimate = self._estimates.get(device_id)
+        if estimate is not None:
+            return estimate
+        slot = self._slots.get(device_id)
+        if slot is None:
+            return None
+        if device_id in self._dirty:
+            # Read before the scheduled pass; solve every pending tank now rather than this one alone.
+            self._solve()
+        slope = self._slopes[slot]
+        level = self._last_level[slot]
+        capacity = self._capacity[slot]
+        burn = None if np.isnan(slope) else max(0.0, -float(slope))
+        days_to_empty = None
+        if burn and not np.isnan(level):
+            days_to_empty = max(0.0, (float(level) - LOW_FUEL_THRESHOLD) / burn)
+        refills = self._refills.get(device_id, [])
+        estimate = self._estimates[device_id] = {
+            "level_change_per_day": None if np.isnan(slope) else float(slope),
+            "gallons_per_day": None if burn is None or np.isnan(capacity) else burn / 100 * float(capacity),
+            "days_to_empty": days_to_empty,
+            "readings": int(self._count[slot]),
+            "last_refill": refills[-1] if refills else None,
+            "refill_count": len(refills)
+        }
+        return estimate
@@ -0,0 +1,315 @@
+import asyncio
+import logging
+import time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
+
+from .api import TankUtilityClient, TankUtilityError, InvalidAuth
+from .const import DOMAIN, DEFAULT_REFRESH_TIMEOUT, REFRESH_COALESCE_WINDOW
+from .models import EMPTY_SNAPSHOT, TankReading, TankSnapshot
+
+_LOGGER = logging.getLogger(__name__)
+
+# Fields whose change means the entities have something new to write.
+READING_FIELDS = (
+    "time", "time_iso", "tank", "temperature", "battery_level", "capacity", "fuelType", "orientation", "status"
+)
+
+def reading_fingerprint(data) -> tuple:
+    """Return a cheap, comparable fingerprint of the fields the entities expose."""
+    if not data:
+        return None
+    return tuple(data.get(key) for key in READING_FIELDS)
+
+async def async_fetch_tank_data(hass: HomeAssistant, client: TankUtilityClient, device_id: str, entry) -> TankReading:
+    """Fetch data for a tank device, mapping API errors to coordinator errors."""
+    metrics = client.metrics.operation("fetch") if client.metrics is not None else None
+    started = time.monotonic() if metrics is not None else 0.0
+    try:
+        data = await client.async_get_device_data(device_id)
+    except InvalidAuth as err:
+        if metrics is not None:
+            metrics.errors["auth"] += 1
+        _LOGGER.error("Authentication failed for device %s: %s", device_id, err)
+        raise ConfigEntryAuthFailed from err
+    except TankUtilityError as err:
+        if metrics is not None:
+            metrics.errors["api"] += 1
+        _LOGGER.error("Error fetching data for device %s: %s", device_id, err)
+        raise UpdateFailed(f"Device {device_id} update failed: {err}") from err
+    except Exception as err:
+        if metrics is not None:
+            metrics.errors["unexpected"] += 1
+        _LOGGER.exception("Unexpected error fetching data for device %s: %s", device_id, err)
+        raise UpdateFailed(f"Unexpected error: {err}") from err
+    finally:
+        if metrics is not None:
+            metrics.observe(time.monotonic() - started)
+    return data
+
+class TankDeviceCoordinator(DataUpdateCoordinator):
+    """Per-device coordinator; the entities of a tank only ever see this tank's data.
+
+    It has no timer of its own: the account's poll scheduler either refreshes it
+    directly (per-device mode) or the account coordinator feeds it (batched mode).
+    A poll that returns an unchanged reading keeps the previous data object, so
+    listeners are not notified and no entity state is written. While the
+    account's circuit breaker is open the last reading is kept as well.
+    Each new reading is turned into a ``TankSnapshot`` before listeners run.
+    A reading restored from storage is shown as stale until the first live fetch.
+    Fetch listeners are called after every successful live fetch, changed or not.
+    On-demand refreshes go through ``async_refresh_now``, which is single-flight.
+    """
+
+    def __init__(self, hass: HomeAssistant, client: TankUtilityClient, entry, device_id: str, device_name: str = None):
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"generac_tank_utility_{device_id}",
+            update_interval=None,
+            always_update=False
+        )
+        self.client = client
+        self.entry = entry
+        self.device_id = device_id
+        self.device_name = device_name or f"Tank {device_id[:6]}"
+        # One device info object shared by every entity of this tank.
+        self.device_info = {
+            "identifiers": {(DOMAIN, device_id)},
+            "name": self.device_name,
+            "manufacturer": "Generac",
+            "model": "Tank Utility Monitor"
+        }
+        self.snapshot = EMPTY_SNAPSHOT
+        self._snapshot_source = None
+        self._fingerprint = None
+        self.suppressed_updates = 0
+        self.suppressed_writes = 0
+        # Set when the tank disappears from the account and is no longer polled.
+        self.retired = False
+        # Fetch time (epoch seconds) of a reading restored from storage, until a live fetch succeeds.
+        self.restored_at = None
+        self._refresh_task = None
+        self._refreshed_at = None
+        self._fetch_listeners = []
+        # Listeners registered by the integration itself rather than by entities; they write no state.
+        self._internal_listeners = 0
+
+    async def async_refresh_now(self) -> None:
+        """Fetch the tank now and return once the result is published.
+
+        Callers arriving while a fetch is in flight, or within
+        ``REFRESH_COALESCE_WINDOW`` seconds after one finished, share its result.
+        """
+        if self._refresh_task is None:
+            if self._refreshed_at is not None and time.monotonic() - self._refreshed_at < REFRESH_COALESCE_WINDOW:
+                _LOGGER.debug("Device %s was just refreshed, not fetching again", self.device_id)
+                return
+            self._refresh_task = self.hass.async_create_task(
+                self._async_refresh_once(), f"{DOMAIN}_refresh_{self.device_id}"
+            )
+        # Shielded so one cancelled caller does not abort the fetch the others are waiting on.
+        await asyncio.shield(self._refresh_task)
+
+    async def _async_refresh_once(self) -> None:
+        try:
+            await self.async_refresh()
+        finally:
+            self._refreshed_at = time.monotonic()
+            self._refresh_task = None
+
+    async def _async_update_data(self) -> dict:
+        if self.data is not None and self.client.breaker.rejecting():
+            # Keep the last good reading instead of failing while the API is paused.
+            _LOGGER.debug("Circuit open, keeping last reading of device %s", self.device_id)
+            return self.data
+        try:
+            data = await async_fetch_tank_data(self.hass, self.client, self.device_id, self.entry)
+        except UpdateFailed:
+            if self.data is not None and self.client.breaker.rejecting():
+                return self.data
+            raise
+        self._async_fetched(data)
+        if self._async_is_unchanged(data):
+            self._async_confirm_restored()
+            # Returning the same object lets the base class skip the listener update.
+            return self.data
+        self.restored_at = None
+        return data
+
+    @callback
+    def async_set_updated_data(self, data) -> None:
+        """Accept data pushed by the account coordinator, dropping unchanged readings."""
+        if data is self.data:
+            # The account coordinator hands back the held object when it kept the last reading.
+            return
+        self._async_fetched(data)
+        if self.last_update_success and self._async_is_unchanged(data):
+            self._async_confirm_restored()
+            return
+        self.restored_at = None
+        super().async_set_updated_data(data)
+
+    @callback
+    def async_add_internal_listener(self, listener):
+        """Add a listener that is not an entity, so it is not counted as a state write."""
+        unsub = self.async_add_listener(listener)
+        self._internal_listeners += 1
+
+        @callback
+        def _async_remove() -> None:
+            unsub()
+            self._internal_listeners -= 1
+        return _async_remove
+
+    @callback
+    def async_add_fetch_listener(self, listener):
+        """Call ``listener(reading)`` after every successful live fetch; return its unsubscribe."""
+        self._fetch_listeners.append(listener)
+        return lambda: self._fetch_listeners.remove(listener)
+
+    @callback
+    def _async_fetched(self, data) -> None:
+        for listener in list(self._fetch_listeners):
+            listener(data)
+
+    @callback
+    def async_restore(self, data, fetched_at: float) -> None:
+        """Seed the coordinator with a stored reading, shown as stale until a live fetch."""
+        self._async_is_unchanged(data)
+        self.restored_at = fetched_at
+        super().async_set_updated_data(data)
+
+    @callback
+    def _async_confirm_restored(self) -> None:
+        """Clear the stale mark when a live fetch returns the restored reading unchanged."""
+        if self.restored_at is not None:
+            self.restored_at = None
+            self._snapshot_source = None
+            self.async_update_listeners()
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Derive the entities' snapshot once per new reading, then notify the listeners."""
+        if self.data is not self._snapshot_source:
+            self._snapshot_source = self.data
+            self.snapshot = TankSnapshot(self.data, self.restored_at)
+        super().async_update_listeners()
+
+    @callback
+    def _async_is_unchanged(self, data) -> bool:
+        fingerprint = reading_fingerprint(data)
+        if self.data is not None and fingerprint == self._fingerprint:
+            self.suppressed_updates += 1
+            self.suppressed_writes += len(self._listeners) - self._internal_listeners
+            _LOGGER.debug("Reading for device %s unchanged, skipping state writes", self.device_id)
+            return True
+        self._fingerprint = fingerprint
+        return False
+
+class TankAccountCoordinator(DataUpdateCoordinator):
+    """Account-level coordinator that fetches every tank in one poll cycle.
+
+    Device requests run concurrently through ``asyncio.gather``, bounded by a
+    semaphore, and each result is pushed to the matching device coordinator.
+    The poll scheduler passes the devices that are due; a plain refresh fetches all.
+    """
+
+    def __init__(self, hass: HomeAssistant, client: TankUtilityClient, entry, device_coordinators: dict,
+                 max_concurrency: int, timeout: float = DEFAULT_REFRESH_TIMEOUT):
+        super().__init__(
+            hass,
+            _LOGGER,
+            name=f"generac_tank_utility_account_{entry.entry_id}",
+            update_interval=None
+        )
+        self.client = client
+        self.entry = entry
+        self.device_coordinators = device_coordinators
+        self._max_concurrency = max(1, max_concurrency)
+        self._timeout = timeout
+        self._requested = None
+
+    async def async_poll_devices(self, device_ids) -> None:
+        """Fetch only the given devices in one batched cycle."""
+        self._requested = [dev_id for dev_id in device_ids if dev_id in self.device_coordinators]
+        try:
+            await self.async_refresh()
+        finally:
+            self._requested = None
+
+    async def _async_update_data(self) -> dict:
+        device_ids = self._requested if self._requested is not None else list(self.device_coordinators)
+        semaphore = asyncio.Semaphore(self._max_concurrency)
+
+        async def _fetch(device_id):
+            async with semaphore:
+                previous = self.device_coordinators[device_id].data
+                if previous is not None and self.client.breaker.rejecting():
+                    return previous
+                try:
+                    return await asyncio.wait_for(
+                        async_fetch_tank_data(self.hass, self.client, device_id, self.entry), self._timeout
+                    )
+                except asyncio.TimeoutError as err:
+                    raise UpdateFailed(f"Device {device_id} timed out after {self._timeout}s") from err
+                except UpdateFailed:
+                    if previous is not None and self.client.breaker.rejecting():
+                        return previous
+                    raise
+
+        results = await asyncio.gather(*(_fetch(dev_id) for dev_id in device_ids), return_exceptions=True)
+        data = dict(self.data or {})
+        fetched = 0
+        auth_failure = None
+        for device_id, result in zip(device_ids, results):
+            coord = self.device_coordinators[device_id]
+            if isinstance(result, BaseException):
+                if isinstance(result, ConfigEntryAuthFailed):
+                    auth_failure = result
+                coord.async_set_update_error(result)
+                continue
+            coord.async_set_updated_data(result)
+            data[device_id] = result
+            fetched += 1
+        _LOGGER.debug("Batched poll fetched %d of %d devices", fetched, len(device_ids))
+        if auth_failure is not None:
+            raise auth_failure
+        if device_ids and not fetched:
+            raise UpdateFailed("No tank data could be fetched for this account")
+        return data
+
+async def async_refresh_all(coordinators, max_concurrency: int, timeout: float) -> int:
+    """Refresh device coordinators concurrently; return how many succeeded.
+
+    A device that fails or exceeds ``timeout`` is left unavailable instead of
+    failing the others.
+    """
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def _refresh(coord):
+        async with semaphore:
+            try:
+                await asyncio.wait_for(coord.async_refresh(), timeout)
+            except asyncio.TimeoutError:
+                _LOGGER.warning("First refresh of device %s timed out after %ss", coord.device_id, timeout)
+                coord.async_set_update_error(UpdateFailed(f"Device {coord.device_id} timed out after {timeout}s"))
+        return coord.last_update_success and coord.data is not None
+
+    results = await asyncio.gather(*(_refresh(coord) for coord in coordinators))
+    return sum(1 for ok in results if ok)
+
+async def async_retry_until_available(coord: TankDeviceCoordinator, delay: float, max_delay: float) -> None:
+    """Retry a device that failed its first refresh, backing off until it has data."""
+    while not coord.last_update_success or coord.data is None:
+        if isinstance(coord.last_exception, ConfigEntryAuthFailed):
+            # Reauthentication reloads the entry; retrying with the same credentials is pointless.
+            return
+        await asyncio.sleep(delay)
+        if coord.retired:
+            return
+        _LOGGER.debug("Retrying unavailable device %s", coord.device_id)
+        await coord.async_refresh()
+        delay = min(delay * 2, max_delay)
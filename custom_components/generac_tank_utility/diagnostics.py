@@ -0,0 +1,31 @@
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from .const import DOMAIN, CONF_EMAIL, CONF_PASSWORD
+from .manager import async_get_manager
+
+TO_REDACT = {CONF_EMAIL, CONF_PASSWORD, "token", "title", "unique_id"}
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    """Return diagnostics for a config entry."""
+    runtime = hass.data[DOMAIN][entry.entry_id]
+    devices = {}
+    for device_id, coord in runtime["coordinators"].items():
+        devices[device_id] = {
+            "available": coord.last_update_success and coord.data is not None,
+            "last_exception": repr(coord.last_exception) if coord.last_exception else None,
+            "suppressed_updates": coord.suppressed_updates,
+            "suppressed_writes": coord.suppressed_writes
+        }
+    return {
+        "entry": async_redact_data(entry.as_dict(), TO_REDACT),
+        "startup_timings": runtime["startup_timings"],
+        "connection_pool": runtime["client"].pool_statistics(),
+        "token": runtime["client"].token_info(),
+        "circuit_breaker": runtime["client"].breaker.as_dict(),
+        "manager": async_get_manager(hass).as_dict(),
+        "api_metrics": runtime["metrics"].as_dict() if runtime["metrics"] else None,
+        "mqtt": runtime["mqtt"].metrics() if runtime["mqtt"] else None,
+        "devices": devices
+    }
@@ -0,0 +1,35 @@
+from homeassistant.core import callback
+from homeassistant.helpers.update_coordinator import CoordinatorEntity
+
+class TankUtilityEntity(CoordinatorEntity):
+    """Base for a tank's entities.
+
+    State is cached in ``_attr_*`` fields from the coordinator's ``TankSnapshot``
+    once per update, so Home Assistant's repeated property reads do no work.
+    All entities of a tank share the coordinator's device info object, and a
+    requested update of any of them is one shared fetch for the tank.
+    """
+    def __init__(self, coordinator, device_id: str, device_name: str):
+        super().__init__(coordinator)
+        self._device_id = device_id
+        self._device_name = device_name
+        self._attr_device_info = coordinator.device_info
+        self._attr_available = False
+        self._update_from_snapshot(coordinator.snapshot)
+
+    def _update_from_snapshot(self, snapshot) -> None:
+        """Copy this entity's values from the snapshot into its ``_attr_*`` fields."""
+        raise NotImplementedError
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        self._update_from_snapshot(self.coordinator.snapshot)
+        super()._handle_coordinator_update()
+
+    async def async_update(self) -> None:
+        """Refresh on request (``homeassistant.update_entity``) through the tank's single-flight fetch."""
+        await self.coordinator.async_refresh_now()
+
+    @property
+    def available(self) -> bool:
+        return self.coordinator.last_update_success and self.coordinator.data is not None and self._attr_available
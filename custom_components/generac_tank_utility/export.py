@@ -0,0 +1,78 @@
+# Reading export to CSV or NDJSON. Home Assistant-free: rows are generated lazily
+# from the history files and written in chunks, so memory use does not grow with
+# the number of tanks or the time range. Runs in the executor.
+import csv
+import gzip
+import io
+import json
+import os
+from datetime import datetime, timezone
+
+FORMAT_CSV = "csv"
+FORMAT_NDJSON = "ndjson"
+EXPORT_FIELDS = (
+    "device_id", "name", "time_iso", "time", "tank", "capacity", "fuelType", "temperature", "battery_level"
+)
+# Per-tank fields taken from the tank's latest reading; the history only stores the measurements.
+DEVICE_FIELDS = ("capacity", "fuelType")
+CHUNK_ROWS = 1000       # Rows formatted in memory before they are written out
+WRITE_BUFFER = 1 << 16  # Bytes buffered by the file object itself
+
+def _time_iso(time_ms: int) -> str:
+    """Format epoch milliseconds like the API's ``time_iso``."""
+    moment = datetime.fromtimestamp(time_ms / 1000, timezone.utc)
+    return moment.isoformat(timespec="milliseconds").replace("+00:00", "Z")
+
+def iter_rows(sources, read_records):
+    """Yield one tuple of ``EXPORT_FIELDS`` per stored reading.
+
+    ``sources`` yields ``(device_id, name, latest_reading)``; ``read_records(device_id)``
+    yields that tank's history records, oldest first.
+    """
+    for device_id, name, latest in sources:
+        device_values = tuple(latest.get(field) if latest is not None else None for field in DEVICE_FIELDS)
+        for record in read_records(device_id):
+            yield (
+                device_id, name, _time_iso(record["time"]), record["time"], record["tank"], *device_values,
+                record["temperature"], record["battery_level"]
+            )
+
+def write_export(path: str, rows, fmt: str = FORMAT_CSV, compress: bool = False, progress=None) -> int:
+    """Write ``rows`` to ``path`` in chunks and return the number written.
+
+    The file is written under a temporary name and renamed when complete, so a
+    reader never sees a partial export. ``progress(rows_written)`` is called after
+    every chunk.
+    """
+    temp_path = f"{path}.part"
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if fmt == FORMAT_CSV else None
+    if writer is not None:
+        writer.writerow(EXPORT_FIELDS)
+    count = 0
+    try:
+        if compress:
+            handle = gzip.open(temp_path, "wt", encoding="utf-8", newline="")
+        else:
+            handle = open(temp_path, "w", encoding="utf-8", newline="", buffering=WRITE_BUFFER)
+        with handle:
+            for row in rows:
+                if writer is not None:
+                    writer.writerow(row)
+                else:
+                    buffer.write(json.dumps(dict(zip(EXPORT_FIELDS, row)), separators=(",", ":")))
+                    buffer.write("\n")
+                count += 1
+                if count % CHUNK_ROWS == 0:
+                    handle.write(buffer.getvalue())
+                    buffer.seek(0)
+                    buffer.truncate()
+                    if progress is not None:
+                        progress(count)
+            handle.write(buffer.getvalue())
+        os.replace(temp_path, path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    return count
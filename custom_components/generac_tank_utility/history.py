@@ -0,0 +1,206 @@
+# Append-only per-device reading history. The file format and HistoryFile are
+# Home Assistant-free; TankHistoryStore only needs ``hass`` for paths and the executor.
+import asyncio
+import logging
+import math
+import mmap
+import os
+import struct
+
+from .const import DOMAIN
+from .models import reading_timestamp
+
+_LOGGER = logging.getLogger(__name__)
+
+# One fixed-width little-endian record per reading:
+# time (epoch ms, int64), tank (%), temperature (°F), numeric battery level, battery status code, padding.
+RECORD = struct.Struct("<qfffB3x")
+RECORD_SIZE = RECORD.size
+BATTERY_STATUS_CODES = {"good": 1, "warning": 2, "low": 3, "critical": 4}
+BATTERY_STATUS_NAMES = {code: name for name, code in BATTERY_STATUS_CODES.items()}
+NAN = float("nan")
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return NAN
+
+def pack_reading(reading) -> bytes:
+    """Encode a reading as one record; return None if it has no timestamp."""
+    timestamp = reading_timestamp(reading)
+    if timestamp is None:
+        return None
+    battery = reading.get("battery_level")
+    status = BATTERY_STATUS_CODES.get(battery.lower(), 0) if isinstance(battery, str) else 0
+    return RECORD.pack(
+        int(timestamp * 1000),
+        _to_float(reading.get("tank")),
+        _to_float(reading.get("temperature")),
+        NAN if isinstance(battery, str) else _to_float(battery),
+        status
+    )
+
+def unpack_record(buffer, offset: int = 0) -> dict:
+    """Decode the record at ``offset`` into a plain dict; NaN fields become None."""
+    time_ms, tank, temperature, battery, status = RECORD.unpack_from(buffer, offset)
+    if not math.isnan(battery):
+        battery_level = round(battery, 1)
+    else:
+        battery_level = BATTERY_STATUS_NAMES.get(status)
+    return {
+        "time": time_ms,
+        "tank": None if math.isnan(tank) else round(tank, 2),
+        "temperature": None if math.isnan(temperature) else round(temperature, 1),
+        "battery_level": battery_level
+    }
+
+class HistoryFile:
+    """One device's history: records sorted by time, appended only when newer.
+
+    All methods do blocking file I/O and must run in an executor.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._last_time = None
+
+    def last_time(self) -> int:
+        """Return the time (epoch ms) of the newest record, or None for an empty file."""
+        if self._last_time is None:
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                return None
+            if size < RECORD_SIZE:
+                return None
+            with open(self.path, "rb") as handle:
+                handle.seek(size - size % RECORD_SIZE - RECORD_SIZE)
+                self._last_time = RECORD.unpack(handle.read(RECORD_SIZE))[0]
+        return self._last_time
+
+    def append(self, record: bytes) -> bool:
+        """Append a packed record unless it is not newer than the last one."""
+        time_ms = RECORD.unpack(record)[0]
+        last = self.last_time()
+        if last is not None and time_ms <= last:
+            return False
+        try:
+            torn = os.path.getsize(self.path) % RECORD_SIZE
+        except OSError:
+            torn = 0
+        if torn:
+            # Drop a partially written record left by an interrupted write.
+            os.truncate(self.path, os.path.getsize(self.path) - torn)
+        with open(self.path, "ab") as handle:
+            handle.write(record)
+        self._last_time = time_ms
+        return True
+
+    def count(self) -> int:
+        try:
+            return os.path.getsize(self.path) // RECORD_SIZE
+        except OSError:
+            return 0
+
+    def read_range(self, start_ms: int = None, end_ms: int = None, limit: int = None) -> list:
+        """Return records with ``start_ms <= time < end_ms``, oldest first, at most ``limit``."""
+        return list(self.iter_range(start_ms, end_ms, limit))
+
+    def iter_range(self, start_ms: int = None, end_ms: int = None, limit: int = None):
+        """Yield records in a time range from a read-only memory map of the file."""
+        count = self.count()
+        if not count:
+            return
+        with open(self.path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            index = 0 if start_ms is None else self._bisect(view, count, start_ms)
+            emitted = 0
+            while index < count and (limit is None or emitted < limit):
+                record = unpack_record(view, index * RECORD_SIZE)
+                if end_ms is not None and record["time"] >= end_ms:
+                    break
+                yield record
+                index += 1
+                emitted += 1
+
+    def read_latest(self, count: int) -> list:
+        """Return the newest ``count`` records, oldest first."""
+        total = self.count()
+        if not total:
+            return []
+        with open(self.path, "rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            return [unpack_record(view, index * RECORD_SIZE) for index in range(max(0, total - count), total)]
+
+    @staticmethod
+    def _bisect(view, count: int, time_ms: int) -> int:
+        """Return the index of the first record with time >= ``time_ms``."""
+        low, high = 0, count
+        while low < high:
+            middle = (low + high) // 2
+            if struct.unpack_from("<q", view, middle * RECORD_SIZE)[0] < time_ms:
+                low = middle + 1
+            else:
+                high = middle
+        return low
+
+class TankHistoryStore:
+    """Per-device history files under ``.storage``, written and read off the event loop."""
+
+    def __init__(self, hass, directory: str):
+        self.hass = hass
+        self.directory = directory
+        self._files = {}
+        self._locks = {}
+
+    def _file(self, device_id: str) -> HistoryFile:
+        if device_id not in self._files:
+            self._files[device_id] = HistoryFile(os.path.join(self.directory, f"{device_id}.bin"))
+            self._locks[device_id] = asyncio.Lock()
+        return self._files[device_id]
+
+    def _append(self, history: HistoryFile, record: bytes) -> bool:
+        os.makedirs(self.directory, exist_ok=True)
+        return history.append(record)
+
+    async def async_add(self, device_id: str, reading) -> bool:
+        """Append a reading if its lastReading time is new; return whether it was stored."""
+        record = pack_reading(reading)
+        if record is None:
+            return False
+        history = self._file(device_id)
+        # Writes for one device are serialized so records stay in time order.
+        async with self._locks[device_id]:
+            try:
+                stored = await self.hass.async_add_executor_job(self._append, history, record)
+            except OSError as err:
+                _LOGGER.warning("Could not write history for device %s: %s", device_id, err)
+                return False
+        if stored:
+            _LOGGER.debug("Stored history record for device %s", device_id)
+        return stored
+
+    def history_files(self, device_ids) -> dict:
+        """Return the ``HistoryFile`` of each device; call on the event loop, then read them in the executor."""
+        return {device_id: self._file(device_id) for device_id in device_ids}
+
+    async def async_query(self, device_id: str, start_ms: int = None, end_ms: int = None, limit: int = None) -> list:
+        """Return a device's readings in a time range, oldest first."""
+        return await self.hass.async_add_executor_job(self._file(device_id).read_range, start_ms, end_ms, limit)
+
+    async def async_query_latest(self, device_id: str, count: int) -> list:
+        """Return a device's newest readings, oldest first."""
+        return await self.hass.async_add_executor_job(self._file(device_id).read_latest, count)
+
+    async def async_query_latest_many(self, device_ids, count: int) -> dict:
+        """Return the newest readings of several devices, oldest first, in one executor job."""
+        files = self.history_files(device_ids)
+        return await self.hass.async_add_executor_job(
+            lambda: {device_id: history.read_latest(count) for device_id, history in files.items()}
+        )
+
+def async_get_history_store(hass) -> TankHistoryStore:
+    """Return the history store shared by every config entry."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if "history" not in domain_data:
+        domain_data["history"] = TankHistoryStore(hass, hass.config.path(".storage", f"{DOMAIN}_history"))
+    return domain_data["history"]
@@ -0,0 +1,439 @@
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import async_track_time_interval
+
+from .aggregate import FleetAggregate
+from .api import TankUtilityClient, TankUtilityError
+from .const import (
+    DOMAIN, CONF_EMAIL, CONF_PASSWORD, CONF_DEVICES, CONF_POLL_MODE, CONF_MAX_CONCURRENCY, CONF_REFRESH_TIMEOUT,
+    CONF_POLL_STRATEGY, CONF_ENABLE_MQTT, CONF_MQTT_PER_FIELD, CONF_MQTT_DISCOVERY, CONF_ENABLE_INSTRUMENTATION,
+    DEFAULT_ENABLE_MQTT, DEFAULT_ENABLE_INSTRUMENTATION, DEFAULT_MQTT_PER_FIELD, DEFAULT_MQTT_DISCOVERY,
+    DEFAULT_SCAN_INTERVAL, DEFAULT_POLL_MODE, DEFAULT_MAX_CONCURRENCY, DEFAULT_REFRESH_TIMEOUT,
+    DEFAULT_POLL_STRATEGY, POLL_MODE_BATCHED, POLL_STRATEGY_ADAPTIVE, DISCOVERY_CACHE_TTL, REDISCOVERY_INTERVAL,
+    STARTUP_RETRY_DELAY, SIGNAL_DEVICES_ADDED, PLATFORMS
+)
+from .consumption import FleetConsumptionModel
+from .coordinator import (
+    TankDeviceCoordinator, TankAccountCoordinator, async_refresh_all, async_retry_until_available
+)
+from .history import async_get_history_store
+from .manager import async_get_manager
+from .metrics import ApiMetrics
+from .models import reading_timestamp
+from .reading_store import TankReadingStore, async_get_reading_store
+from .scheduler import TankPollScheduler
+from .services import async_setup_services
+from .token_store import async_get_token_store
+from .websocket import async_setup_websocket
+
+_LOGGER = logging.getLogger(__name__)
+
+# Options that change how coordinators are built; anything else is applied without a reload.
+RELOAD_OPTIONS = {
+    CONF_POLL_MODE: DEFAULT_POLL_MODE,
+    CONF_MAX_CONCURRENCY: DEFAULT_MAX_CONCURRENCY,
+    CONF_REFRESH_TIMEOUT: DEFAULT_REFRESH_TIMEOUT,
+    CONF_POLL_STRATEGY: DEFAULT_POLL_STRATEGY,
+    CONF_ENABLE_MQTT: DEFAULT_ENABLE_MQTT,
+    CONF_MQTT_PER_FIELD: DEFAULT_MQTT_PER_FIELD,
+    CONF_MQTT_DISCOVERY: DEFAULT_MQTT_DISCOVERY,
+    CONF_ENABLE_INSTRUMENTATION: DEFAULT_ENABLE_INSTRUMENTATION
+}
+
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+async def async_setup(hass: HomeAssistant, config: dict) -> bool:
+    """Register the integration's services and websocket commands once, for all accounts."""
+    async_setup_services(hass)
+    async_setup_websocket(hass)
+    return True
+
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Set up the Generac Tank Utility integration from a config entry."""
+    _LOGGER.info("Setting up Generac Tank Utility for account %s", entry.data.get(CONF_EMAIL))
+    started = time.monotonic()
+    hass.data.setdefault(DOMAIN, {})
+    email = entry.data[CONF_EMAIL]
+    password = entry.data[CONF_PASSWORD]
+    devices = entry.data.get(CONF_DEVICES, [])
+    batched = entry.options.get(CONF_POLL_MODE, DEFAULT_POLL_MODE) == POLL_MODE_BATCHED
+    max_concurrency = entry.options.get(CONF_MAX_CONCURRENCY, DEFAULT_MAX_CONCURRENCY)
+    timeout = entry.options.get(CONF_REFRESH_TIMEOUT, DEFAULT_REFRESH_TIMEOUT)
+    metrics = ApiMetrics() if entry.options.get(CONF_ENABLE_INSTRUMENTATION, DEFAULT_ENABLE_INSTRUMENTATION) else None
+    manager = async_get_manager(hass)
+    client = TankUtilityClient(
+        hass, email, password, token_store=async_get_token_store(hass), metrics=metrics,
+        **manager.async_register(entry.entry_id)
+    )
+    coordinators = {}
+    for device in devices:
+        device_id = device["id"]
+        _LOGGER.debug("Creating coordinator for device %s", device_id)
+        coordinators[device_id] = TankDeviceCoordinator(hass, client, entry, device_id, device.get("name"))
+    reading_store = await async_get_reading_store(hass)
+    # Restored before any listener is attached, so a stored reading is not recorded or exported again.
+    restored = _async_restore_readings(reading_store, coordinators)
+    account_coordinator = None
+    if batched:
+        account_coordinator = TankAccountCoordinator(
+            hass, client, entry, coordinators,
+            max_concurrency=max_concurrency,
+            timeout=timeout
+        )
+
+    async def _async_poll(device_ids):
+        if account_coordinator is not None:
+            await account_coordinator.async_poll_devices(device_ids)
+        else:
+            await asyncio.gather(*(
+                coordinators[dev_id].async_refresh() for dev_id in device_ids if dev_id in coordinators
+            ))
+
+    def _data_for(device_id):
+        coord = coordinators.get(device_id)
+        return coord.data if coord is not None else None
+
+    scheduler = TankPollScheduler(
+        hass, entry, _async_poll, _data_for,
+        adaptive=entry.options.get(CONF_POLL_STRATEGY, DEFAULT_POLL_STRATEGY) == POLL_STRATEGY_ADAPTIVE
+    )
+    for device_id in coordinators:
+        scheduler.async_set_interval(device_id, entry.options.get(f"interval_{device_id}", DEFAULT_SCAN_INTERVAL))
+    entry.async_on_unload(scheduler.async_stop)
+    history = async_get_history_store(hass)
+    consumption = FleetConsumptionModel(loop=hass.loop)
+    fleet = FleetAggregate(hass.loop)
+    mqtt_exporter = None
+    if entry.options.get(CONF_ENABLE_MQTT, DEFAULT_ENABLE_MQTT):
+        # Imported here so the MQTT integration is only loaded when export is enabled.
+        from .mqtt_export import MqttExporter
+        mqtt_exporter = MqttExporter(
+            hass, entry,
+            per_field=entry.options.get(CONF_MQTT_PER_FIELD, DEFAULT_MQTT_PER_FIELD),
+            discovery=entry.options.get(CONF_MQTT_DISCOVERY, DEFAULT_MQTT_DISCOVERY)
+        )
+    device_unsubs = {}
+    for device in devices:
+        coord = coordinators[device["id"]]
+        name = device.get("name", f"Tank {device['id'][:6]}")
+        device_unsubs[device["id"]] = _async_attach_listeners(
+            hass, entry, coord, name, history, reading_store, consumption, fleet, mqtt_exporter
+        )
+
+    @callback
+    def _async_detach_listeners() -> None:
+        for unsubs in device_unsubs.values():
+            for unsub in unsubs:
+                unsub()
+        device_unsubs.clear()
+
+    entry.async_on_unload(_async_detach_listeners)
+    if mqtt_exporter is not None:
+        mqtt_exporter.async_start()
+    hass.data[DOMAIN][entry.entry_id] = {
+        "client": client,
+        "coordinators": coordinators,
+        "account_coordinator": account_coordinator,
+        "scheduler": scheduler,
+        "consumption": consumption,
+        "fleet": fleet,
+        "mqtt": mqtt_exporter,
+        "metrics": metrics,
+        "history": history,
+        "reading_store": reading_store,
+        "device_unsubs": device_unsubs,
+        "options": entry.options,
+        "startup_timings": {}
+    }
+    entry.async_on_unload(entry.add_update_listener(_async_update_listener))
+    setup_done = time.monotonic()
+    # Entities are created up front and stay unavailable until their tank's first refresh lands.
+    await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
+    platforms_done = time.monotonic()
+    hass.data[DOMAIN][entry.entry_id]["startup_timings"].update({
+        "setup": round(setup_done - started, 3),
+        "platforms": round(platforms_done - setup_done, 3)
+    })
+    # The first refresh runs in the background so Home Assistant startup is not held up by the API.
+    entry.async_create_background_task(
+        hass,
+        _async_first_refresh(hass, entry, max_concurrency, timeout, started, restored),
+        f"{DOMAIN}_first_refresh_{entry.entry_id}"
+    )
+
+    @callback
+    def _async_schedule_rediscovery(_now) -> None:
+        entry.async_create_background_task(
+            hass, _async_rediscover(hass, entry), f"{DOMAIN}_rediscover_{entry.entry_id}"
+        )
+
+    entry.async_on_unload(async_track_time_interval(
+        hass, _async_schedule_rediscovery, timedelta(seconds=REDISCOVERY_INTERVAL), cancel_on_shutdown=True
+    ))
+    return True
+
+async def _async_first_refresh(hass: HomeAssistant, entry: ConfigEntry, max_concurrency: int, timeout: float,
+                               started: float, restored: dict) -> None:
+    """Run the first refresh of every tank without data concurrently, then hand polling over to the scheduler.
+
+    Tanks restored from storage are not fetched here; the scheduler polls them
+    once their stored reading is as old as their interval.
+    """
+    runtime = hass.data[DOMAIN][entry.entry_id]
+    coordinators = runtime["coordinators"]
+    account_coordinator = runtime["account_coordinator"]
+    await _async_seed_consumption(hass, runtime["consumption"], coordinators)
+    seeded = _async_seed_from_discovery(hass, entry, coordinators)
+    pending = [coord for coord in coordinators.values() if coord.data is None]
+    refresh_started = time.monotonic()
+    if pending and account_coordinator is not None:
+        await account_coordinator.async_poll_devices([coord.device_id for coord in pending])
+    elif pending:
+        await async_refresh_all(pending, max_concurrency, timeout)
+    succeeded = sum(1 for coord in coordinators.values() if coord.last_update_success and coord.data is not None)
+    finished = time.monotonic()
+    runtime["scheduler"].async_start(ages={
+        device_id: age for device_id, age in restored.items() if coordinators[device_id].restored_at is not None
+    })
+    timings = runtime["startup_timings"]
+    timings.update({
+        "first_refresh": round(finished - refresh_started, 3),
+        "total": round(finished - started, 3),
+        "devices_ok": succeeded,
+        "devices_seeded": seeded,
+        "devices_restored": len(restored),
+        "devices_total": len(coordinators)
+    })
+    _LOGGER.info(
+        "Startup of %s: setup %.3fs, platforms %.3fs, first refresh %.3fs, total %.3fs (%d/%d devices ok)",
+        entry.data.get(CONF_EMAIL), timings["setup"], timings["platforms"], timings["first_refresh"],
+        timings["total"], succeeded, len(coordinators)
+    )
+    for coord in coordinators.values():
+        if coord.last_update_success and coord.data is not None:
+            continue
+        entry.async_create_background_task(
+            hass,
+            async_retry_until_available(coord, STARTUP_RETRY_DELAY, DEFAULT_SCAN_INTERVAL),
+            f"{DOMAIN}_retry_{coord.device_id}"
+        )
+
+@callback
+def _async_attach_listeners(hass: HomeAssistant, entry: ConfigEntry, coord, device_name: str, history,
+                            reading_store: TankReadingStore, consumption: FleetConsumptionModel,
+                            fleet: FleetAggregate, mqtt_exporter) -> list:
+    """Register a device coordinator's history, storage, consumption, fleet and MQTT listeners.
+
+    Returns their unsubscribes. A reading the coordinator already holds (restored
+    from storage) is counted in the fleet aggregate right away.
+    """
+    fleet_feeder = _fleet_feeder(fleet, coord, device_name)
+    unsubs = [
+        coord.async_add_internal_listener(_history_recorder(hass, entry, history, coord)),
+        coord.async_add_fetch_listener(_reading_saver(reading_store, coord)),
+        # Registered before the entities' listeners, so the model is current when they write state.
+        coord.async_add_internal_listener(_consumption_feeder(consumption, coord)),
+        coord.async_add_internal_listener(fleet_feeder)
+    ]
+    if mqtt_exporter is not None:
+        unsubs.append(coord.async_add_internal_listener(_mqtt_enqueuer(mqtt_exporter, coord, device_name)))
+    fleet_feeder()
+    return unsubs
+
+def _history_recorder(hass: HomeAssistant, entry: ConfigEntry, history, coord):
+    """Return a coordinator listener that appends each new reading to the device's history."""
+    @callback
+    def _async_record() -> None:
+        if coord.data is not None:
+            entry.async_create_background_task(
+                hass, history.async_add(coord.device_id, coord.data), f"{DOMAIN}_history_{coord.device_id}"
+            )
+    return _async_record
+
+def _reading_saver(reading_store: TankReadingStore, coord):
+    """Return a fetch listener that stores every live reading, changed or not, with its fetch time."""
+    @callback
+    def _async_save(reading) -> None:
+        if reading is not None:
+            reading_store.async_record(coord.device_id, reading)
+    return _async_save
+
+def _consumption_feeder(consumption: FleetConsumptionModel, coord):
+    """Return a coordinator listener that adds each new fuel level to the consumption model."""
+    @callback
+    def _async_feed() -> None:
+        data = coord.data
+        timestamp = reading_timestamp(data)
+        if timestamp is None or not isinstance(data.get("tank"), (int, float)):
+            return
+        consumption.add(coord.device_id, timestamp, float(data["tank"]), data.get("capacity"))
+    return _async_feed
+
+def _fleet_feeder(fleet: FleetAggregate, coord, device_name: str):
+    """Return a coordinator listener that hands each new snapshot to the account's fleet aggregate."""
+    @callback
+    def _async_feed() -> None:
+        if coord.data is None:
+            return
+        snapshot = coord.snapshot
+        fleet.update(
+            coord.device_id, device_name, snapshot.level, coord.data.get("capacity"),
+            snapshot.low_fuel, snapshot.low_battery
+        )
+    return _async_feed
+
+def _mqtt_enqueuer(exporter, coord, device_name: str):
+    """Return a coordinator listener that hands each new reading to the MQTT export stage."""
+    @callback
+    def _async_enqueue() -> None:
+        if coord.data is not None:
+            exporter.async_enqueue(coord.device_id, device_name, coord.data)
+    return _async_enqueue
+
+async def _async_seed_consumption(hass: HomeAssistant, consumption: FleetConsumptionModel, coordinators: dict) -> None:
+    """Prime the consumption model with the most recent stored readings of every tank."""
+    history = async_get_history_store(hass)
+    latest = await history.async_query_latest_many(list(coordinators), consumption.window)
+    for device_id, records in latest.items():
+        records = [record for record in records if record["tank"] is not None]
+        if records:
+            consumption.add_many(
+                device_id, [record["time"] / 1000 for record in records], [record["tank"] for record in records]
+            )
+
+async def _async_rediscover(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Add tanks that appeared on the account and retire removed ones, leaving the others untouched."""
+    runtime = hass.data[DOMAIN].get(entry.entry_id)
+    if runtime is None:
+        return
+    client = runtime["client"]
+    coordinators = runtime["coordinators"]
+    try:
+        listed = await client.async_list_devices()
+    except TankUtilityError as err:
+        _LOGGER.debug("Device rediscovery for %s failed: %s", entry.data.get(CONF_EMAIL), err)
+        return
+    if not listed:
+        # An empty list is far more likely an API glitch than every tank being removed.
+        _LOGGER.debug("Device rediscovery for %s returned no devices, ignoring", entry.data.get(CONF_EMAIL))
+        return
+    listed_ids = set(listed)
+    added = [dev_id for dev_id in listed if dev_id not in coordinators]
+    removed = [dev_id for dev_id in coordinators if dev_id not in listed_ids]
+    if not added and not removed:
+        return
+    _LOGGER.info(
+        "Tank Utility account %s: %d tank(s) added, %d removed", entry.data.get(CONF_EMAIL), len(added), len(removed)
+    )
+    for device_id in removed:
+        _async_retire_device(hass, entry, runtime, device_id)
+    readings = await asyncio.gather(*(client.async_get_device_data(dev_id) for dev_id in added), return_exceptions=True)
+    new_devices = []
+    for device_id, reading in zip(added, readings):
+        if isinstance(reading, Exception):
+            _LOGGER.warning("Could not fetch data for new device %s: %s", device_id, reading)
+            reading = None
+        name = (reading.get("name") if reading else None) or f"Tank {device_id[:6]}"
+        coord = TankDeviceCoordinator(hass, client, entry, device_id, name)
+        coordinators[device_id] = coord
+        runtime["device_unsubs"][device_id] = _async_attach_listeners(
+            hass, entry, coord, name, runtime["history"], runtime["reading_store"], runtime["consumption"],
+            runtime["fleet"], runtime["mqtt"]
+        )
+        if reading is not None:
+            coord.async_set_updated_data(reading)
+        else:
+            entry.async_create_background_task(
+                hass,
+                async_retry_until_available(coord, STARTUP_RETRY_DELAY, DEFAULT_SCAN_INTERVAL),
+                f"{DOMAIN}_retry_{device_id}"
+            )
+        runtime["scheduler"].async_set_interval(
+            device_id, entry.options.get(f"interval_{device_id}", DEFAULT_SCAN_INTERVAL)
+        )
+        new_devices.append({"id": device_id, "name": name})
+    devices = [device for device in entry.data.get(CONF_DEVICES, []) if device["id"] not in removed]
+    retired_options = {f"interval_{device_id}" for device_id in removed}
+    options = {key: value for key, value in entry.options.items() if key not in retired_options}
+    hass.config_entries.async_update_entry(
+        entry, data={**entry.data, CONF_DEVICES: devices + new_devices}, options=options
+    )
+    if new_devices:
+        async_dispatcher_send(hass, SIGNAL_DEVICES_ADDED.format(entry.entry_id), new_devices)
+
+@callback
+def _async_retire_device(hass: HomeAssistant, entry: ConfigEntry, runtime: dict, device_id: str) -> None:
+    """Stop polling a removed tank and remove its device, and with it its entities."""
+    runtime["scheduler"].async_remove_device(device_id)
+    coord = runtime["coordinators"].pop(device_id)
+    coord.retired = True
+    runtime["reading_store"].async_remove(device_id)
+    runtime["fleet"].remove(device_id)
+    for unsub in runtime["device_unsubs"].pop(device_id, []):
+        unsub()
+    registry = dr.async_get(hass)
+    device = registry.async_get_device(identifiers={(DOMAIN, device_id)})
+    if device is not None:
+        registry.async_update_device(device.id, remove_config_entry_id=entry.entry_id)
+
+@callback
+def _async_restore_readings(reading_store: TankReadingStore, coordinators: dict) -> dict:
+    """Seed coordinators with their stored readings; return the age in seconds of each restored one."""
+    now = time.time()
+    ages = {}
+    for device_id, coord in coordinators.items():
+        stored = reading_store.get(device_id)
+        if stored is None:
+            continue
+        reading, fetched_at = stored
+        coord.async_restore(reading, fetched_at)
+        ages[device_id] = now - fetched_at
+    if ages:
+        _LOGGER.debug("Restored %d of %d devices from storage", len(ages), len(coordinators))
+    return ages
+
+@callback
+def _async_seed_from_discovery(hass: HomeAssistant, entry: ConfigEntry, coordinators: dict) -> int:
+    """Hand the readings fetched by the config flow to the coordinators; return how many were seeded."""
+    discovery = hass.data[DOMAIN].get("discovery", {}).pop(entry.unique_id, None)
+    if discovery is None or time.monotonic() - discovery["fetched_at"] > DISCOVERY_CACHE_TTL:
+        return 0
+    seeded = 0
+    for device_id, reading in discovery["readings"].items():
+        coord = coordinators.get(device_id)
+        if coord is not None and coord.data is None:
+            coord.async_set_updated_data(reading)
+            seeded += 1
+    _LOGGER.debug("Seeded %d of %d devices from the config flow", seeded, len(coordinators))
+    return seeded
+
+async def _async_update_listener(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Apply changed options: intervals are updated live, structural options need a reload."""
+    runtime = hass.data[DOMAIN][entry.entry_id]
+    previous = runtime["options"]
+    runtime["options"] = entry.options
+    if any(previous.get(key, default) != entry.options.get(key, default) for key, default in RELOAD_OPTIONS.items()):
+        _LOGGER.debug("Polling options changed for %s, reloading", entry.data.get(CONF_EMAIL))
+        await hass.config_entries.async_reload(entry.entry_id)
+        return
+    scheduler = runtime["scheduler"]
+    for device_id in runtime["coordinators"]:
+        scheduler.async_set_interval(device_id, entry.options.get(f"interval_{device_id}", DEFAULT_SCAN_INTERVAL))
+
+async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
+    """Unload the Generac Tank Utility integration."""
+    _LOGGER.info("Unloading Generac Tank Utility for account %s", entry.data.get(CONF_EMAIL))
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
+    if unload_ok:
+        runtime = hass.data[DOMAIN].pop(entry.entry_id, None)
+        if runtime:
+            await runtime["client"].async_close()
+        await async_get_manager(hass).async_release(entry.entry_id)
+    return unload_ok
@@ -0,0 +1,70 @@
+import logging
+
+from homeassistant.const import EVENT_HOMEASSISTANT_CLOSE
+from homeassistant.core import Event, HomeAssistant
+
+from .api import default_ssl_context
+from .client import POOL_LIMIT_PER_HOST, RATE_BURST, RATE_LIMIT, create_session
+from .const import DOMAIN
+from .resilience import FairLimiter, TokenBucket
+
+_LOGGER = logging.getLogger(__name__)
+
+class TankUtilityManager:
+    """Request budget shared by every account of this integration.
+
+    All clients use one connection pool, take a slot from one concurrency limit
+    (granted round-robin across accounts) and draw from one request-rate bucket,
+    so many accounts together stay within what a single account may send.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self.request_limiter = FairLimiter(POOL_LIMIT_PER_HOST)
+        self.rate_limiter = TokenBucket(RATE_LIMIT, RATE_BURST)
+        self._session = None
+        self._pool_stats = {"connections_created": 0, "connections_reused": 0, "dns_cache_hits": 0,
+                            "dns_cache_misses": 0}
+        self._accounts = set()
+        self._unsub_close = None
+
+    def async_register(self, entry_id: str) -> dict:
+        """Add an account and return the shared client arguments for it."""
+        self._accounts.add(entry_id)
+        if self._session is None or self._session.closed:
+            self._session = create_session(self._pool_stats, default_ssl_context())
+            # Entries are not unloaded when Home Assistant stops, so close the session with it.
+            self._unsub_close = self.hass.bus.async_listen_once(EVENT_HOMEASSISTANT_CLOSE, self._async_close_session)
+        return {"session": self._session, "rate_limiter": self.rate_limiter, "request_limiter": self.request_limiter}
+
+    async def async_release(self, entry_id: str) -> None:
+        """Remove an account; the shared session is closed once no account is left."""
+        self._accounts.discard(entry_id)
+        if self._accounts:
+            return
+        if self._unsub_close is not None:
+            self._unsub_close()
+            self._unsub_close = None
+        await self._async_close_session()
+        _LOGGER.debug("Last account unloaded, closed the shared session")
+
+    async def _async_close_session(self, _event: Event = None) -> None:
+        self._unsub_close = None
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def as_dict(self) -> dict:
+        return {
+            "accounts": len(self._accounts),
+            "connection_pool": dict(self._pool_stats),
+            "request_limiter": self.request_limiter.as_dict(),
+            "rate_limiter": self.rate_limiter.as_dict()
+        }
+
+def async_get_manager(hass: HomeAssistant) -> TankUtilityManager:
+    """Return the manager shared by every config entry of this integration."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if "manager" not in domain_data:
+        domain_data["manager"] = TankUtilityManager(hass)
+    return domain_data["manager"]
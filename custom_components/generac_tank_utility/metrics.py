@@ -0,0 +1,81 @@
+# Request and fetch instrumentation. Home Assistant-free. A client without metrics
+# holds ``None`` instead, so the disabled hot path costs one ``is not None`` check.
+import bisect
+from collections import Counter
+
+# Upper bounds (ms) of the latency histogram buckets; slower calls land in a final overflow bucket.
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+class OperationMetrics:
+    """Counters and a fixed-bucket latency histogram for one kind of call."""
+
+    __slots__ = ("calls", "retries", "bytes_received", "statuses", "errors", "buckets", "total_ms", "max_ms")
+
+    def __init__(self):
+        self.calls = 0
+        self.retries = 0
+        self.bytes_received = 0
+        self.statuses = Counter()
+        self.errors = Counter()
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def observe(self, seconds: float) -> None:
+        """Record the duration of one call."""
+        elapsed_ms = seconds * 1000
+        self.calls += 1
+        self.total_ms += elapsed_ms
+        if elapsed_ms > self.max_ms:
+            self.max_ms = elapsed_ms
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+    def percentile(self, fraction: float) -> float:
+        """Return the upper bound of the bucket holding the given fraction of calls."""
+        if not self.calls:
+            return None
+        target = fraction * self.calls
+        seen = 0
+        for index, count in enumerate(self.buckets):
+            seen += count
+            if seen >= target:
+                return LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else round(self.max_ms, 1)
+        return round(self.max_ms, 1)
+
+    def as_dict(self) -> dict:
+        return {
+            "calls": self.calls,
+            "retries": self.retries,
+            "bytes_received": self.bytes_received,
+            "statuses": {str(status): count for status, count in self.statuses.items()},
+            "errors": dict(self.errors),
+            "latency_ms": {
+                "avg": round(self.total_ms / self.calls, 1) if self.calls else None,
+                "p50": self.percentile(0.5),
+                "p95": self.percentile(0.95),
+                "max": round(self.max_ms, 1),
+                "buckets": {
+                    **{f"le_{bound}": count for bound, count in zip(LATENCY_BUCKETS_MS, self.buckets)},
+                    "overflow": self.buckets[-1]
+                }
+            }
+        }
+
+class ApiMetrics:
+    """Per-operation metrics for one account: ``token``, ``device_list``, ``device_data`` and ``fetch``."""
+
+    def __init__(self):
+        self._operations = {}
+
+    def operation(self, name: str) -> OperationMetrics:
+        operation = self._operations.get(name)
+        if operation is None:
+            operation = self._operations[name] = OperationMetrics()
+        return operation
+
+    def get(self, name: str) -> OperationMetrics:
+        """Return an operation's metrics, or None if it has not been recorded yet."""
+        return self._operations.get(name)
+
+    def as_dict(self) -> dict:
+        return {name: operation.as_dict() for name, operation in self._operations.items()}
@@ -0,0 +1,159 @@
+# Payload decoding and the compact reading model. This module must not import
+# Home Assistant, so benchmarks and tooling can load it on its own.
+import json
+from datetime import datetime, timezone
+from types import MappingProxyType
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from .const import LOW_FUEL_THRESHOLD, LOW_BATTERY_THRESHOLD
+
+# Reading fields shown as attributes of the fuel level sensor.
+LEVEL_ATTRIBUTES = ("capacity", "fuelType", "orientation", "status", "time_iso")
+
+def decode_json(body: bytes):
+    """Parse a response body in a single pass, with orjson when it is installed.
+
+    Raises ValueError (which both backends' decode errors subclass) on a bad body.
+    """
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+class TankReading:
+    """The fields of a device payload the integration uses, merged from ``device`` and ``lastReading``.
+
+    Attribute names match the API keys, and the mapping-style ``get``, ``in`` and
+    ``[]`` accessors treat a missing field as absent, like the merged dict did.
+    """
+
+    __slots__ = (
+        "name", "capacity", "fuelType", "orientation", "status",
+        "battery_level", "tank", "temperature", "time", "time_iso"
+    )
+
+    def __init__(self, **fields):
+        for key in self.__slots__:
+            setattr(self, key, fields.get(key))
+
+    @classmethod
+    def from_payload(cls, raw) -> "TankReading":
+        """Extract a reading from a decoded ``devices/{id}`` response."""
+        device = raw.get("device") if isinstance(raw, dict) else None
+        if not isinstance(device, dict):
+            device = {}
+        last_reading = device.get("lastReading")
+        if not isinstance(last_reading, dict):
+            last_reading = {}
+        reading = cls.__new__(cls)
+        for key in cls.__slots__:
+            # lastReading wins over device-level fields, as in the merged payload.
+            setattr(reading, key, last_reading[key] if key in last_reading else device.get(key))
+        return reading
+
+    def get(self, key: str, default=None):
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        return default if value is None else value
+
+    def __getitem__(self, key: str):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key) -> bool:
+        return self.get(key) is not None
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, TankReading):
+            return NotImplemented
+        return all(getattr(self, key) == getattr(other, key) for key in self.__slots__)
+
+    __hash__ = None
+
+    def as_dict(self) -> dict:
+        """Return the present fields as a plain dict."""
+        return {key: value for key in self.__slots__ if (value := getattr(self, key)) is not None}
+
+    def __repr__(self) -> str:
+        return f"TankReading({self.as_dict()!r})"
+
+def _number(value) -> float:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return value
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+class TankSnapshot:
+    """Entity-ready values of one reading, derived once per coordinator update and then immutable.
+
+    Every entity of a tank reads its state from the same snapshot instead of
+    re-parsing the reading in its own property getters. A reading restored from
+    storage passes ``restored_at`` (when it was fetched, epoch seconds), which
+    marks the entities stale until a live fetch confirms or replaces it.
+    """
+
+    __slots__ = (
+        "level", "temperature", "battery", "battery_numeric", "low_fuel", "low_battery", "level_attributes",
+        "stale_attributes"
+    )
+
+    def __init__(self, data=None, restored_at: float = None):
+        data = data or {}
+        tank = _number(data.get("tank"))
+        temperature = _number(data.get("temperature"))
+        battery = data.get("battery_level")
+        battery_numeric = isinstance(battery, (int, float)) and not isinstance(battery, bool)
+        if battery_numeric:
+            low_battery = battery <= LOW_BATTERY_THRESHOLD
+        elif isinstance(battery, str):
+            low_battery = battery.lower() in ("low", "critical")
+        else:
+            low_battery = False
+        attributes = {key: data.get(key) for key in LEVEL_ATTRIBUTES if data.get(key) is not None}
+        if "time_iso" in attributes:
+            attributes["last_update"] = attributes["time_iso"]
+        stale = {}
+        if restored_at is not None:
+            stale = {"stale": True, "fetched_at": datetime.fromtimestamp(restored_at, timezone.utc).isoformat()}
+            attributes.update(stale)
+        set_field = object.__setattr__
+        set_field(self, "level", None if tank is None else round(tank, 1))
+        set_field(self, "temperature", None if temperature is None else round(temperature, 1))
+        set_field(self, "battery", battery)
+        set_field(self, "battery_numeric", battery_numeric)
+        set_field(self, "low_fuel", tank is not None and tank <= LOW_FUEL_THRESHOLD)
+        set_field(self, "low_battery", low_battery)
+        set_field(self, "level_attributes", MappingProxyType(attributes))
+        set_field(self, "stale_attributes", MappingProxyType(stale) if stale else None)
+
+    def __setattr__(self, key, value):
+        raise AttributeError("TankSnapshot is immutable")
+
+    def __repr__(self) -> str:
+        return f"TankSnapshot(level={self.level!r}, temperature={self.temperature!r}, battery={self.battery!r})"
+
+EMPTY_SNAPSHOT = TankSnapshot()
+
+def reading_timestamp(data) -> float:
+    """Return the epoch seconds of a device's lastReading, or None if it has none.
+
+    ``time`` is epoch milliseconds; ``time_iso`` is used when ``time`` is missing.
+    """
+    if not data:
+        return None
+    value = data.get("time")
+    if isinstance(value, (int, float)) and value > 0:
+        return value / 1000 if value > 1e11 else float(value)
+    value = data.get("time_iso")
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        except ValueError:
+            return None
+    return None
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import logging
+import time
+
+from homeassistant.components import mqtt
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, MQTT_MAX_PENDING
+
+_LOGGER = logging.getLogger(__name__)
+
+MQTT_DISCOVERY_PREFIX = "homeassistant"
+# (reading field, per-field topic suffix, discovery name, unit, device class)
+MQTT_FIELDS = (
+    ("tank", "tank", "Fuel Level", "%", None),
+    ("temperature", "temperature", "Temperature", "°F", "temperature"),
+    ("battery_level", "battery", "Battery", None, None),
+)
+
+class MqttExporter:
+    """Publish tank readings to MQTT from a bounded, coalescing queue.
+
+    Polling only enqueues; a single worker publishes one JSON state message per
+    device (plus optional per-field topics). A device that is still queued when a
+    newer reading arrives is overwritten, and the oldest device is dropped when
+    the queue is full. Retained discovery configs go out once per device.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry, per_field: bool, discovery: bool,
+                 max_pending: int = MQTT_MAX_PENDING):
+        self.hass = hass
+        self.entry = entry
+        self._per_field = per_field
+        self._discovery = discovery
+        self._max_pending = max_pending
+        self._pending = {}
+        self._wakeup = asyncio.Event()
+        self._discovered = set()
+        self._names = {}
+        self._enabled = True
+        self._metrics = {
+            "enqueued": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "published": 0,
+            "failed": 0,
+            "latency_last_ms": None,
+            "latency_max_ms": 0.0,
+            "latency_total_ms": 0.0
+        }
+
+    @callback
+    def async_start(self) -> None:
+        """Start the publishing worker; it stops when the entry unloads."""
+        self.entry.async_create_background_task(self.hass, self._async_run(), f"{DOMAIN}_mqtt_{self.entry.entry_id}")
+
+    @callback
+    def async_enqueue(self, device_id: str, device_name: str, reading) -> None:
+        """Queue a device's latest reading, replacing one that has not been published yet."""
+        if not self._enabled:
+            return
+        self._names[device_id] = device_name
+        self._metrics["enqueued"] += 1
+        if device_id in self._pending:
+            self._metrics["coalesced"] += 1
+        elif len(self._pending) >= self._max_pending:
+            oldest = next(iter(self._pending))
+            del self._pending[oldest]
+            self._metrics["dropped"] += 1
+            _LOGGER.debug("MQTT queue full, dropped pending reading for device %s", oldest)
+        self._pending[device_id] = reading
+        self._wakeup.set()
+
+    def metrics(self) -> dict:
+        """Return queue depth and publish counters for diagnostics."""
+        published = self._metrics["published"]
+        return {
+            **self._metrics,
+            "queue_depth": len(self._pending),
+            "latency_avg_ms": round(self._metrics["latency_total_ms"] / published, 2) if published else None,
+            "discovered_devices": len(self._discovered)
+        }
+
+    async def _async_run(self) -> None:
+        if not await mqtt.async_wait_for_mqtt_client(self.hass):
+            _LOGGER.warning("MQTT export is enabled but the MQTT integration is not available")
+            self._enabled = False
+            self._pending.clear()
+            return
+        while True:
+            await self._wakeup.wait()
+            self._wakeup.clear()
+            while self._pending:
+                device_id = next(iter(self._pending))
+                reading = self._pending.pop(device_id)
+                await self._async_publish(device_id, reading)
+
+    async def _async_publish(self, device_id: str, reading) -> None:
+        topic_prefix = f"homeassistant/{DOMAIN}/{device_id}"
+        started = time.monotonic()
+        try:
+            if self._discovery and device_id not in self._discovered:
+                await self._async_publish_discovery(device_id, topic_prefix)
+                self._discovered.add(device_id)
+            values = {field: reading.get(field) for field, *_ in MQTT_FIELDS}
+            values["time_iso"] = reading.get("time_iso")
+            await mqtt.async_publish(
+                self.hass, f"{topic_prefix}/state",
+                json.dumps({key: value for key, value in values.items() if value is not None})
+            )
+            if self._per_field:
+                for field, suffix, *_ in MQTT_FIELDS:
+                    if values[field] is not None:
+                        await mqtt.async_publish(self.hass, f"{topic_prefix}/{suffix}", str(values[field]))
+        except Exception as err:
+            self._metrics["failed"] += 1
+            _LOGGER.warning("Failed to publish MQTT data for device %s: %s", device_id, err)
+            return
+        latency = (time.monotonic() - started) * 1000
+        self._metrics["published"] += 1
+        self._metrics["latency_last_ms"] = round(latency, 2)
+        self._metrics["latency_max_ms"] = round(max(self._metrics["latency_max_ms"], latency), 2)
+        self._metrics["latency_total_ms"] += latency
+        _LOGGER.debug("Published MQTT data for device %s", device_id)
+
+    async def _async_publish_discovery(self, device_id: str, topic_prefix: str) -> None:
+        device_name = self._names.get(device_id, device_id)
+        device = {
+            "identifiers": [f"{DOMAIN}_mqtt_{device_id}"],
+            "name": device_name,
+            "manufacturer": "Generac",
+            "model": "Tank Utility Monitor"
+        }
+        for field, suffix, name, unit, device_class in MQTT_FIELDS:
+            config = {
+                "name": f"{device_name} {name}",
+                "unique_id": f"{DOMAIN}_mqtt_{device_id}_{suffix}",
+                "state_topic": f"{topic_prefix}/state",
+                "value_template": f"{{{{ value_json.{field} }}}}",
+                "device": device
+            }
+            if unit:
+                config["unit_of_measurement"] = unit
+            if device_class:
+                config["device_class"] = device_class
+            await mqtt.async_publish(
+                self.hass, f"{MQTT_DISCOVERY_PREFIX}/sensor/{DOMAIN}_{device_id}/{suffix}/config",
+                json.dumps(config), retain=True
+            )
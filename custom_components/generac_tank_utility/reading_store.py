@@ -0,0 +1,60 @@
+import logging
+import time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+from .models import TankReading
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.readings"
+SAVE_DELAY = 60  # Seconds to collect new readings before writing them out in one save
+
+class TankReadingStore:
+    """Persist each tank's latest reading, with the time it was fetched, for a warm start.
+
+    Writes are debounced with ``async_delay_save``; Home Assistant flushes a
+    pending save on shutdown.
+    """
+
+    def __init__(self, hass: HomeAssistant):
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._data = {}
+
+    async def async_load(self) -> None:
+        self._data = await self._store.async_load() or {}
+
+    def get(self, device_id: str):
+        """Return ``(reading, fetched_at)`` for a tank, or None if nothing was stored."""
+        record = self._data.get(device_id)
+        if not record:
+            return None
+        return TankReading(**record["reading"]), record["fetched_at"]
+
+    @callback
+    def async_record(self, device_id: str, reading) -> None:
+        """Remember a newly fetched reading and schedule a save."""
+        self._data[device_id] = {"reading": reading.as_dict(), "fetched_at": time.time()}
+        self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def async_remove(self, device_id: str) -> None:
+        """Forget a tank that was removed from its account."""
+        if self._data.pop(device_id, None) is not None:
+            self._store.async_delay_save(self._data_to_save, SAVE_DELAY)
+
+    @callback
+    def _data_to_save(self) -> dict:
+        return self._data
+
+async def async_get_reading_store(hass: HomeAssistant) -> TankReadingStore:
+    """Return the reading store shared by every config entry, loading it on first use."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if "reading_store" not in domain_data:
+        store = TankReadingStore(hass)
+        await store.async_load()
+        domain_data.setdefault("reading_store", store)
+    return domain_data["reading_store"]
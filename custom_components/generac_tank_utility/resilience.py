@@ -0,0 +1,229 @@
+# Failure handling for API requests. Home Assistant-free: each client owns a
+# CircuitBreaker, takes a FairLimiter slot and draws from a TokenBucket before
+# every request it sends.
+import asyncio
+import logging
+import random
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from datetime import timezone
+from email.utils import parsedate_to_datetime
+
+_LOGGER = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+def backoff_delay(attempt: int, base: float, cap: float) -> float:
+    """Return a full-jitter exponential backoff delay for a 0-based retry attempt."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+def parse_retry_after(value: str, now: float = None) -> float:
+    """Return the delay in seconds from a Retry-After header (seconds or HTTP date), or None."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when is None:
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, when.timestamp() - (time.time() if now is None else now))
+
+class CircuitBreaker:
+    """Account-wide circuit: closed, open after repeated failures, half-open to probe.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and requests
+    are refused for ``reset_timeout`` seconds (longer if the server asked for it).
+    Then one probe request is let through: success closes the circuit, failure
+    reopens it with the timeout doubled, up to ``max_reset_timeout``.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float, max_reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._timeout = reset_timeout
+        self._opened_until = 0.0
+        self._probing = False
+        self.trips = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        if self._state == STATE_OPEN and time.monotonic() >= self._opened_until:
+            return STATE_HALF_OPEN
+        return self._state
+
+    def rejecting(self) -> bool:
+        """Return True while a new request would be refused."""
+        state = self.state
+        return state == STATE_OPEN or (state == STATE_HALF_OPEN and self._probing)
+
+    def retry_in(self) -> float:
+        """Return the seconds until the circuit lets a probe through."""
+        return max(0.0, self._opened_until - time.monotonic())
+
+    def allow_request(self) -> bool:
+        """Return whether a request may be sent now; in half-open state only one probe is."""
+        state = self.state
+        if state == STATE_CLOSED:
+            return True
+        if state == STATE_HALF_OPEN and not self._probing:
+            self._state = STATE_HALF_OPEN
+            self._probing = True
+            return True
+        self.rejected += 1
+        return False
+
+    def record_success(self) -> None:
+        """Note that the API answered; closes the circuit after a successful probe."""
+        if self._state != STATE_CLOSED:
+            _LOGGER.info("Tank Utility API is answering again, closing circuit")
+        self._state = STATE_CLOSED
+        self._failures = 0
+        self._timeout = self.reset_timeout
+        self._probing = False
+
+    def record_failure(self) -> None:
+        """Note a server or connection failure; may open the circuit."""
+        self._failures += 1
+        if self._state == STATE_HALF_OPEN:
+            self._timeout = min(self._timeout * 2, self.max_reset_timeout)
+            self.open()
+        elif self._state == STATE_CLOSED and self._failures >= self.failure_threshold:
+            self.open()
+
+    def release_probe(self) -> None:
+        """Let another request probe if the current probe was cancelled without an outcome."""
+        self._probing = False
+
+    def open(self, delay: float = None) -> None:
+        """Open the circuit for the current timeout, or ``delay`` seconds if that is longer."""
+        duration = max(self._timeout, delay or 0.0)
+        self._state = STATE_OPEN
+        self._probing = False
+        self._opened_until = time.monotonic() + duration
+        self.trips += 1
+        _LOGGER.warning(
+            "Tank Utility API failing (%d consecutive failures), pausing requests for %.0fs",
+            self._failures, duration
+        )
+
+    def as_dict(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "retry_in": round(self.retry_in(), 1) if self._state == STATE_OPEN else None,
+            "trips": self.trips,
+            "rejected": self.rejected
+        }
+
+class TokenBucket:
+    """Allow ``rate`` requests per second on average, with bursts of up to ``capacity``.
+
+    Callers reserve a token immediately and sleep until it is due, so waiters are
+    released in arrival order without polling.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self.waits = 0
+        self.wait_time = 0.0
+
+    async def acquire(self) -> float:
+        """Wait for a request token; return how long the caller waited."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        self._tokens -= 1
+        if self._tokens >= 0:
+            return 0.0
+        delay = -self._tokens / self.rate
+        self.waits += 1
+        self.wait_time += delay
+        await asyncio.sleep(delay)
+        return delay
+
+    def as_dict(self) -> dict:
+        return {
+            "rate": self.rate,
+            "capacity": self.capacity,
+            "waits": self.waits,
+            "wait_time": round(self.wait_time, 2)
+        }
+
+class FairLimiter:
+    """Cap concurrent requests, granting free slots round-robin across accounts.
+
+    Waiters queue per account; each freed slot goes to the next account in turn,
+    so an account with thousands of queued requests cannot starve the others.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self._active = 0
+        self._queues = OrderedDict()
+        self.waits = 0
+
+    @asynccontextmanager
+    async def slot(self, account: str):
+        """Hold one of the ``limit`` slots for the duration of the block."""
+        await self._acquire(account)
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, account: str) -> None:
+        if self._active < self.limit and not self._queues:
+            self._active += 1
+            return
+        waiter = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(account, deque()).append(waiter)
+        self.waits += 1
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # Granted just as we were cancelled: hand the slot on.
+                self._release()
+            raise
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._grant()
+
+    def _grant(self) -> None:
+        while self._active < self.limit and self._queues:
+            account, queue = next(iter(self._queues.items()))
+            waiter = queue.popleft()
+            if queue:
+                self._queues.move_to_end(account)
+            else:
+                del self._queues[account]
+            if waiter.done():
+                continue
+            self._active += 1
+            waiter.set_result(None)
+
+    def as_dict(self) -> dict:
+        return {
+            "limit": self.limit,
+            "active": self._active,
+            "queued": sum(len(queue) for queue in self._queues.values()),
+            "accounts_waiting": len(self._queues),
+            "waits": self.waits
+        }
@@ -0,0 +1,188 @@
+import logging
+import time
+import zlib
+
+from homeassistant.core import HassJob, HomeAssistant, callback
+from homeassistant.helpers.event import async_call_later
+
+from .const import MIN_SCAN_INTERVAL, MAX_STAGGER, ADAPTIVE_GRACE, ADAPTIVE_BACKOFF_BASE, ADAPTIVE_MAX_DELAY
+from .models import reading_timestamp
+
+_LOGGER = logging.getLogger(__name__)
+
+# Devices falling due within this window of each other are polled in the same wakeup.
+COALESCE_WINDOW = 1.0
+
+def stagger_offset(device_id: str, interval: float) -> float:
+    """Return a deterministic per-device start offset (seconds) within the stagger window.
+
+    The offset is derived from a CRC of the device ID, so a tank keeps the same slot
+    across restarts while tanks on the same account are spread apart.
+    """
+    window = min(interval / 4, MAX_STAGGER)
+    return (zlib.crc32(device_id.encode()) / 0xFFFFFFFF) * window
+
+class AdaptivePollPolicy:
+    """Learn a tank's reporting cadence from successive lastReading timestamps.
+
+    After a new reading, the next poll is planned just after the following reading
+    is expected. While the timestamp is unchanged the delay backs off exponentially.
+    """
+
+    # Weight of the newest gap in the cadence estimate.
+    SMOOTHING = 0.3
+
+    def __init__(self, fallback_interval: float):
+        self.fallback_interval = fallback_interval
+        self.last_reading = None
+        self.cadence = None
+        self.misses = 0
+
+    def next_delay(self, reading_ts, now: float) -> float:
+        """Return seconds until the next poll, given the timestamp just fetched."""
+        if reading_ts is None:
+            return self.fallback_interval
+        if reading_ts != self.last_reading:
+            if self.last_reading is not None and reading_ts > self.last_reading:
+                gap = reading_ts - self.last_reading
+                self.cadence = gap if self.cadence is None else (
+                    self.SMOOTHING * gap + (1 - self.SMOOTHING) * self.cadence
+                )
+            self.last_reading = reading_ts
+            self.misses = 0
+            if self.cadence is None:
+                return self.fallback_interval
+            expected = reading_ts + self.cadence + ADAPTIVE_GRACE
+            if expected > now:
+                return min(max(expected - now, MIN_SCAN_INTERVAL), ADAPTIVE_MAX_DELAY)
+        self.misses += 1
+        backoff = ADAPTIVE_BACKOFF_BASE * 2 ** (self.misses - 1)
+        return min(max(backoff, MIN_SCAN_INTERVAL), ADAPTIVE_MAX_DELAY)
+
+class TankPollScheduler:
+    """Poll each tank on its own interval from a single, re-armed timer.
+
+    ``poll`` is a coroutine function taking the list of device IDs that are due;
+    it decides whether they are fetched as one batch or one coordinator at a time.
+    In adaptive mode ``data_for`` returns a device's latest data, from which an
+    ``AdaptivePollPolicy`` plans that device's next poll.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry, poll, data_for=None, adaptive: bool = False):
+        self.hass = hass
+        self.entry = entry
+        self._poll = poll
+        self._data_for = data_for
+        self._adaptive = adaptive and data_for is not None
+        self._policies = {}
+        self._intervals = {}
+        self._next_due = {}
+        self._last_polled = {}
+        self._unsub_timer = None
+        self._job = HassJob(self._async_timer_fired, cancel_on_shutdown=True)
+        self._started = False
+
+    @callback
+    def async_set_interval(self, device_id: str, interval: float) -> None:
+        """Add a device or change its interval; takes effect without a reload."""
+        interval = max(float(interval), MIN_SCAN_INTERVAL)
+        if self._intervals.get(device_id) == interval:
+            return
+        self._intervals[device_id] = interval
+        if self._adaptive:
+            self._policies.setdefault(device_id, AdaptivePollPolicy(interval)).fallback_interval = interval
+        if not self._started:
+            return
+        now = time.monotonic()
+        last = self._last_polled.get(device_id)
+        if last is None:
+            self._next_due[device_id] = now + interval + stagger_offset(device_id, interval)
+        else:
+            self._next_due[device_id] = max(now, last + interval)
+        _LOGGER.debug("Polling interval for device %s set to %ss", device_id, interval)
+        self._async_arm()
+
+    @callback
+    def async_remove_device(self, device_id: str) -> None:
+        """Stop polling a device."""
+        self._intervals.pop(device_id, None)
+        self._policies.pop(device_id, None)
+        self._next_due.pop(device_id, None)
+        self._last_polled.pop(device_id, None)
+        if self._started:
+            self._async_arm()
+
+    @callback
+    def async_start(self, ages: dict = None) -> None:
+        """Start scheduling; call once the first refresh has completed.
+
+        ``ages`` maps devices whose data was not just fetched (restored from
+        storage) to its age in seconds; they are polled once that age reaches
+        their interval, right away if it already has. In adaptive mode they keep
+        that due time, since no cadence has been learned for them yet.
+        """
+        self._started = True
+        now = time.monotonic()
+        ages = ages or {}
+        for device_id, interval in self._intervals.items():
+            last = now - min(max(ages.get(device_id, 0.0), 0.0), interval)
+            self._last_polled[device_id] = last
+            self._next_due[device_id] = last + interval + stagger_offset(device_id, interval)
+        if self._adaptive:
+            self._async_plan_adaptive([device_id for device_id in self._intervals if device_id not in ages])
+        self._async_arm()
+
+    @callback
+    def async_stop(self) -> None:
+        """Cancel the timer."""
+        self._started = False
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+
+    @callback
+    def _async_arm(self) -> None:
+        if self._unsub_timer is not None:
+            self._unsub_timer()
+            self._unsub_timer = None
+        if not self._next_due:
+            return
+        delay = max(0.0, min(self._next_due.values()) - time.monotonic())
+        self._unsub_timer = async_call_later(self.hass, delay, self._job)
+
+    @callback
+    def _async_timer_fired(self, _now) -> None:
+        self._unsub_timer = None
+        now = time.monotonic()
+        due = [dev_id for dev_id, when in self._next_due.items() if when <= now + COALESCE_WINDOW]
+        for device_id in due:
+            interval = self._intervals[device_id]
+            # Keep each device on its own phase; if we fell behind, restart the phase from now.
+            next_due = self._next_due[device_id] + interval
+            self._next_due[device_id] = next_due if next_due > now else now + interval
+            self._last_polled[device_id] = now
+        self._async_arm()
+        if due:
+            _LOGGER.debug("Polling %d due device(s)", len(due))
+            self.entry.async_create_background_task(
+                self.hass, self._async_poll(due), f"generac_tank_utility_poll_{self.entry.entry_id}"
+            )
+
+    async def _async_poll(self, device_ids) -> None:
+        await self._poll(device_ids)
+        if self._adaptive and self._started:
+            self._async_plan_adaptive(device_ids)
+            self._async_arm()
+
+    @callback
+    def _async_plan_adaptive(self, device_ids) -> None:
+        """Replace the fixed next-due time with the one planned from the latest reading."""
+        now_wall = time.time()
+        now = time.monotonic()
+        for device_id in device_ids:
+            policy = self._policies.get(device_id)
+            if policy is None or device_id not in self._next_due:
+                continue
+            delay = policy.next_delay(reading_timestamp(self._data_for(device_id)), now_wall)
+            self._next_due[device_id] = now + delay
+            _LOGGER.debug("Next adaptive poll of device %s in %.0fs", device_id, delay)
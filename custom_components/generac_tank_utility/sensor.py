@@ -1,8 +1,17 @@
 import logging
-from homeassistant.helpers.update_coordinator import CoordinatorEntity
+from datetime import datetime, timezone
+
+from homeassistant.core import callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
 from homeassistant.components.sensor import SensorEntity, SensorStateClass
+try:
+    from homeassistant.helpers.entity import EntityCategory
+    ENTITY_CATEGORY_DIAGNOSTIC = EntityCategory.DIAGNOSTIC
+except ImportError:
+    ENTITY_CATEGORY_DIAGNOSTIC = "diagnostic"
 
-from .const import DOMAIN, CONF_DEVICES
+from .const import DOMAIN, CONF_DEVICES, SIGNAL_DEVICES_ADDED, LOW_FUEL_THRESHOLD, LOW_BATTERY_THRESHOLD
+from .entity import TankUtilityEntity
 
 # Import the Home Assistant constants module and retrieve required constants with fallbacks.
 import homeassistant.const as ha_const
@@ -20,14 +29,52 @@ try:
     DEVICE_CLASS_BATTERY = ha_const.DEVICE_CLASS_BATTERY
 except AttributeError:
     DEVICE_CLASS_BATTERY = "battery"
+try:
+    from homeassistant.components.sensor import SensorDeviceClass
+    DEVICE_CLASS_TIMESTAMP = SensorDeviceClass.TIMESTAMP
+except ImportError:
+    DEVICE_CLASS_TIMESTAMP = "timestamp"
+try:
+    TIME_DAYS = ha_const.UnitOfTime.DAYS
+    TIME_MILLISECONDS = ha_const.UnitOfTime.MILLISECONDS
+except AttributeError:
+    TIME_DAYS = "d"
+    TIME_MILLISECONDS = "ms"
+VOLUME_GALLONS = "gal"
+VOLUME_FLOW_GALLONS_PER_DAY = "gal/d"
 
 _LOGGER = logging.getLogger(__name__)
 
 async def async_setup_entry(hass, entry, async_add_entities):
     """Set up Generac Tank Utility sensors for each tank device."""
     data = hass.data[DOMAIN][entry.entry_id]
-    coordinators = data["coordinators"]
     devices = entry.data.get(CONF_DEVICES, [])
+    entities = _device_entities(data, entry, devices)
+    fleet = data["fleet"]
+    entities.append(TankFleetFuelSensor(entry, fleet))
+    entities.append(TankFleetMinimumLevelSensor(entry, fleet))
+    entities.append(TankFleetLowFuelSensor(entry, fleet))
+    entities.append(TankFleetLowBatterySensor(entry, fleet))
+    metrics = data["metrics"]
+    if metrics is not None:
+        entities.append(TankApiRequestsSensor(entry, metrics))
+        entities.append(TankApiLatencySensor(entry, metrics))
+        entities.append(TankApiErrorsSensor(entry, metrics))
+    if entities:
+        async_add_entities(entities)
+        _LOGGER.info("Added %d sensor entities", len(entities))
+
+    @callback
+    def _async_add_devices(new_devices) -> None:
+        async_add_entities(_device_entities(data, entry, new_devices))
+
+    entry.async_on_unload(
+        async_dispatcher_connect(hass, SIGNAL_DEVICES_ADDED.format(entry.entry_id), _async_add_devices)
+    )
+
+def _device_entities(data, entry, devices) -> list:
+    coordinators = data["coordinators"]
+    consumption = data["consumption"]
     entities = []
     for device in devices:
         device_id = device["id"]
@@ -38,99 +85,319 @@ async def async_setup_entry(hass, entry, async_add_entities):
         entities.append(TankLevelSensor(coord, entry, device_id, name))
         entities.append(TankTemperatureSensor(coord, entry, device_id, name))
         entities.append(TankBatterySensor(coord, entry, device_id, name))
-    if entities:
-        async_add_entities(entities)
-        _LOGGER.info("Added %d sensor entities", len(entities))
+        entities.append(TankConsumptionRateSensor(coord, entry, device_id, name, consumption))
+        entities.append(TankDaysToEmptySensor(coord, entry, device_id, name, consumption))
+        entities.append(TankLastRefillSensor(coord, entry, device_id, name, consumption))
+    return entities
 
-class TankUtilitySensorBase(CoordinatorEntity, SensorEntity):
+class TankUtilitySensorBase(TankUtilityEntity, SensorEntity):
     """Base sensor entity for Generac Tank Utility."""
     def __init__(self, coordinator, config_entry, device_id: str, device_name: str):
-        super().__init__(coordinator)
-        self._device_id = device_id
-        self._device_name = device_name
         self._config_entry = config_entry
-        self._attr_device_info = {
-            "identifiers": {(DOMAIN, device_id)},
-            "name": device_name,
-            "manufacturer": "Generac",
-            "model": "Tank Utility Monitor"
-        }
         self._attr_unique_id = f"{device_id}_{self.__class__.__name__}"
-
-    @property
-    def available(self) -> bool:
-        return super().available and self.coordinator.data is not None
+        super().__init__(coordinator, device_id, device_name)
 
 class TankLevelSensor(TankUtilitySensorBase):
     """Sensor for tank fuel level percentage."""
     def __init__(self, coordinator, config_entry, device_id, device_name):
-        super().__init__(coordinator, config_entry, device_id, device_name)
         self._attr_name = f"{device_name} Fuel Level"
-        self._attr_unit_of_measurement = PERCENTAGE
+        self._attr_native_unit_of_measurement = PERCENTAGE
         self._attr_icon = "mdi:propane-tank"
         self._attr_state_class = SensorStateClass.MEASUREMENT
+        super().__init__(coordinator, config_entry, device_id, device_name)
 
-    @property
-    def state(self):
-        data = self.coordinator.data
-        if not data or "tank" not in data:
-            return None
-        try:
-            return round(data["tank"], 1)
-        except (ValueError, TypeError):
-            return data["tank"]
-
-    @property
-    def extra_state_attributes(self):
-        attrs = {}
-        data = self.coordinator.data or {}
-        for key in ("capacity", "fuelType", "orientation", "status", "time_iso"):
-            if key in data:
-                attrs[key] = data[key]
-        if "time_iso" in data:
-            attrs["last_update"] = data["time_iso"]
-        return attrs
+    def _update_from_snapshot(self, snapshot) -> None:
+        self._attr_available = True
+        self._attr_native_value = snapshot.level
+        self._attr_extra_state_attributes = snapshot.level_attributes
 
 class TankTemperatureSensor(TankUtilitySensorBase):
     """Sensor for tank temperature in °F."""
     def __init__(self, coordinator, config_entry, device_id, device_name):
-        super().__init__(coordinator, config_entry, device_id, device_name)
         self._attr_name = f"{device_name} Temperature"
-        self._attr_unit_of_measurement = TEMP_FAHRENHEIT
+        self._attr_native_unit_of_measurement = TEMP_FAHRENHEIT
         self._attr_device_class = DEVICE_CLASS_TEMPERATURE
         self._attr_state_class = SensorStateClass.MEASUREMENT
+        super().__init__(coordinator, config_entry, device_id, device_name)
 
-    @property
-    def state(self):
-        data = self.coordinator.data
-        if not data or "temperature" not in data:
-            return None
-        try:
-            return round(data["temperature"], 1)
-        except (ValueError, TypeError):
-            return data["temperature"]
-
-    @property
-    def available(self) -> bool:
-        return super().available and "temperature" in (self.coordinator.data or {})
+    def _update_from_snapshot(self, snapshot) -> None:
+        self._attr_available = snapshot.temperature is not None
+        self._attr_native_value = snapshot.temperature
+        self._attr_extra_state_attributes = snapshot.stale_attributes
 
 class TankBatterySensor(TankUtilitySensorBase):
     """Sensor for monitor battery level."""
     def __init__(self, coordinator, config_entry, device_id, device_name):
-        super().__init__(coordinator, config_entry, device_id, device_name)
         self._attr_name = f"{device_name} Battery"
-        self._attr_unit_of_measurement = PERCENTAGE
-        self._attr_device_class = DEVICE_CLASS_BATTERY
+        super().__init__(coordinator, config_entry, device_id, device_name)
+
+    def _update_from_snapshot(self, snapshot) -> None:
+        self._attr_available = snapshot.battery is not None
+        self._attr_native_value = snapshot.battery
+        self._attr_extra_state_attributes = snapshot.stale_attributes
+        # The API usually reports a status string (e.g., "good", "low"); only a number is a battery percentage.
+        if snapshot.battery_numeric:
+            self._attr_native_unit_of_measurement = PERCENTAGE
+            self._attr_device_class = DEVICE_CLASS_BATTERY
+            self._attr_state_class = SensorStateClass.MEASUREMENT
+        else:
+            self._attr_native_unit_of_measurement = None
+            self._attr_device_class = None
+            self._attr_state_class = None
+
+class TankConsumptionSensorBase(TankUtilitySensorBase):
+    """Base for sensors derived from the account's fleet consumption model.
+
+    They are written when the model publishes the tank's new estimate, after its
+    batched solve; coordinator updates only write them when availability changes.
+    """
+    def __init__(self, coordinator, config_entry, device_id, device_name, consumption):
+        self._consumption = consumption
+        self._written_available = None
+        super().__init__(coordinator, config_entry, device_id, device_name)
+
+    async def async_added_to_hass(self) -> None:
+        await super().async_added_to_hass()
+        self.async_on_remove(self._consumption.add_listener(self._device_id, self._async_estimate_updated))
+
+    def _update_from_snapshot(self, snapshot) -> None:
+        self._attr_available = True
+        self._update_from_estimate(self._consumption.estimate(self._device_id) or {})
+
+    @callback
+    def _handle_coordinator_update(self) -> None:
+        if self.available != self._written_available:
+            self._async_write()
+
+    @callback
+    def _async_estimate_updated(self) -> None:
+        self._update_from_estimate(self._consumption.estimate(self._device_id) or {})
+        self._async_write()
+
+    @callback
+    def _async_write(self) -> None:
+        self._written_available = self.available
+        self.async_write_ha_state()
+
+    def _update_from_estimate(self, estimate: dict) -> None:
+        raise NotImplementedError
+
+class TankConsumptionRateSensor(TankConsumptionSensorBase):
+    """Sensor for the fuel burn rate in gallons per day."""
+    def __init__(self, coordinator, config_entry, device_id, device_name, consumption):
+        self._attr_name = f"{device_name} Consumption Rate"
+        self._attr_native_unit_of_measurement = VOLUME_FLOW_GALLONS_PER_DAY
+        self._attr_icon = "mdi:fire"
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        super().__init__(coordinator, config_entry, device_id, device_name, consumption)
+
+    def _update_from_estimate(self, estimate: dict) -> None:
+        value = estimate.get("gallons_per_day")
+        change = estimate.get("level_change_per_day")
+        self._attr_native_value = None if value is None else round(value, 2)
+        self._attr_extra_state_attributes = {
+            "level_change_per_day": None if change is None else round(change, 3),
+            "readings": estimate.get("readings", 0)
+        }
+
+class TankDaysToEmptySensor(TankConsumptionSensorBase):
+    """Sensor for the projected days until the tank reaches the low fuel threshold."""
+    def __init__(self, coordinator, config_entry, device_id, device_name, consumption):
+        self._attr_name = f"{device_name} Days to Empty"
+        self._attr_native_unit_of_measurement = TIME_DAYS
+        self._attr_icon = "mdi:calendar-clock"
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        super().__init__(coordinator, config_entry, device_id, device_name, consumption)
+
+    def _update_from_estimate(self, estimate: dict) -> None:
+        value = estimate.get("days_to_empty")
+        self._attr_native_value = None if value is None else round(value, 1)
+
+class TankLastRefillSensor(TankConsumptionSensorBase):
+    """Sensor for the time of the last detected refill."""
+    def __init__(self, coordinator, config_entry, device_id, device_name, consumption):
+        self._attr_name = f"{device_name} Last Refill"
+        self._attr_device_class = DEVICE_CLASS_TIMESTAMP
+        self._attr_icon = "mdi:gas-station"
+        super().__init__(coordinator, config_entry, device_id, device_name, consumption)
+
+    def _update_from_estimate(self, estimate: dict) -> None:
+        refill = estimate.get("last_refill")
+        attrs = {"refill_count": estimate.get("refill_count", 0)}
+        if refill:
+            attrs["level_before"] = round(refill[1], 1)
+            attrs["level_after"] = round(refill[2], 1)
+        self._attr_native_value = datetime.fromtimestamp(refill[0], timezone.utc) if refill else None
+        self._attr_extra_state_attributes = attrs
+
+def _account_device_info(config_entry) -> dict:
+    return {
+        "identifiers": {(DOMAIN, config_entry.entry_id)},
+        "name": config_entry.title,
+        "manufacturer": "Generac",
+        "model": "Tank Utility Account"
+    }
+
+class TankFleetSensorBase(SensorEntity):
+    """Base for account-wide sensors computed from the account's ``FleetAggregate``.
+
+    The aggregate is updated per tank as readings arrive; these sensors only
+    copy its figures, once per batch of tank updates.
+    """
+    _attr_should_poll = False
+
+    def __init__(self, config_entry, fleet):
+        self._fleet = fleet
+        self._attr_device_info = _account_device_info(config_entry)
+        self._attr_unique_id = f"{config_entry.entry_id}_{self.__class__.__name__}"
+        self._update_from_fleet()
+
+    async def async_added_to_hass(self) -> None:
+        self.async_on_remove(self._fleet.add_listener(self._handle_fleet_update))
+
+    @callback
+    def _handle_fleet_update(self) -> None:
+        self._update_from_fleet()
+        self.async_write_ha_state()
+
+    def _update_from_fleet(self) -> None:
+        raise NotImplementedError
+
+class TankFleetFuelSensor(TankFleetSensorBase):
+    """Sensor for the gallons on hand across all tanks of the account."""
+    def __init__(self, config_entry, fleet):
+        self._attr_name = f"{config_entry.title} Total Fuel"
+        self._attr_native_unit_of_measurement = VOLUME_GALLONS
+        self._attr_icon = "mdi:propane-tank"
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        super().__init__(config_entry, fleet)
+
+    def _update_from_fleet(self) -> None:
+        self._attr_native_value = round(self._fleet.total_gallons, 1)
+        self._attr_extra_state_attributes = {"tanks": len(self._fleet)}
+
+class TankFleetMinimumLevelSensor(TankFleetSensorBase):
+    """Sensor for the lowest fuel level on the account, naming the tank that has it."""
+    def __init__(self, config_entry, fleet):
+        self._attr_name = f"{config_entry.title} Lowest Fuel Level"
+        self._attr_native_unit_of_measurement = PERCENTAGE
+        self._attr_icon = "mdi:propane-tank-outline"
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        super().__init__(config_entry, fleet)
+
+    def _update_from_fleet(self) -> None:
+        minimum = self._fleet.minimum()
+        if minimum is None:
+            self._attr_native_value = None
+            self._attr_extra_state_attributes = None
+            return
+        level, device_id, name = minimum
+        self._attr_native_value = level
+        self._attr_extra_state_attributes = {"tank": name, "device_id": device_id}
+
+class TankFleetLowFuelSensor(TankFleetSensorBase):
+    """Sensor for the number of tanks at or below the low fuel threshold."""
+    def __init__(self, config_entry, fleet):
+        self._attr_name = f"{config_entry.title} Tanks Low on Fuel"
+        self._attr_icon = "mdi:gauge-low"
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_extra_state_attributes = {"threshold": LOW_FUEL_THRESHOLD}
+        super().__init__(config_entry, fleet)
+
+    def _update_from_fleet(self) -> None:
+        self._attr_native_value = self._fleet.low_fuel
+
+class TankFleetLowBatterySensor(TankFleetSensorBase):
+    """Sensor for the number of tank monitors with a low battery."""
+    def __init__(self, config_entry, fleet):
+        self._attr_name = f"{config_entry.title} Tanks with Low Battery"
+        self._attr_icon = "mdi:battery-low"
         self._attr_state_class = SensorStateClass.MEASUREMENT
+        self._attr_extra_state_attributes = {"threshold": LOW_BATTERY_THRESHOLD}
+        super().__init__(config_entry, fleet)
+
+    def _update_from_fleet(self) -> None:
+        self._attr_native_value = self._fleet.low_battery
+
+class TankApiMetricsSensorBase(SensorEntity):
+    """Base for per-account diagnostic sensors; polled, since metrics change with every request."""
+    _attr_entity_category = ENTITY_CATEGORY_DIAGNOSTIC
+
+    def __init__(self, config_entry, metrics):
+        self._metrics = metrics
+        self._attr_device_info = _account_device_info(config_entry)
+        self._attr_unique_id = f"{config_entry.entry_id}_{self.__class__.__name__}"
+
+    def _operations(self, names) -> list:
+        """Return the recorded metrics of the named operations; reading them never creates an entry."""
+        return [operation for operation in map(self._metrics.get, names) if operation is not None]
+
+class TankApiRequestsSensor(TankApiMetricsSensorBase):
+    """Sensor for the number of HTTP requests made to the API."""
+    def __init__(self, config_entry, metrics):
+        super().__init__(config_entry, metrics)
+        self._attr_name = f"{config_entry.title} API Requests"
+        self._attr_icon = "mdi:api"
+        self._attr_state_class = SensorStateClass.TOTAL_INCREASING
 
     @property
-    def state(self):
-        data = self.coordinator.data
-        if not data or "battery_level" not in data:
-            return None
-        # Battery level is now returned as a string (e.g., "good", "low")
-        return data["battery_level"]
-    
+    def native_value(self):
+        return sum(operation.calls for operation in self._operations(("token", "device_list", "device_data")))
+
     @property
-    def available(self) -> bool:
-        return super().available and "battery_level" in (self.coordinator.data or {})
+    def extra_state_attributes(self):
+        attrs = {}
+        for name in ("token", "device_list", "device_data"):
+            operation = self._metrics.get(name)
+            if operation is None:
+                attrs.update({f"{name}_statuses": {}, f"{name}_retries": 0, f"{name}_bytes": 0})
+                continue
+            attrs[f"{name}_statuses"] = {str(status): count for status, count in operation.statuses.items()}
+            attrs[f"{name}_retries"] = operation.retries
+            attrs[f"{name}_bytes"] = operation.bytes_received
+        return attrs
+
+class TankApiLatencySensor(TankApiMetricsSensorBase):
+    """Sensor for the 95th percentile time to fetch one tank's data."""
+    def __init__(self, config_entry, metrics):
+        super().__init__(config_entry, metrics)
+        self._attr_name = f"{config_entry.title} Fetch Latency"
+        self._attr_native_unit_of_measurement = TIME_MILLISECONDS
+        self._attr_icon = "mdi:timer-outline"
+        self._attr_state_class = SensorStateClass.MEASUREMENT
+
+    @property
+    def native_value(self):
+        operation = self._metrics.get("fetch")
+        return operation.percentile(0.95) if operation is not None else None
+
+    @property
+    def extra_state_attributes(self):
+        operation = self._metrics.get("fetch")
+        if operation is None:
+            return {"avg": None, "p50": None, "max": None}
+        latency = operation.as_dict()["latency_ms"]
+        return {key: latency[key] for key in ("avg", "p50", "max")}
+
+class TankApiErrorsSensor(TankApiMetricsSensorBase):
+    """Sensor for the number of failed tank data fetches."""
+    def __init__(self, config_entry, metrics):
+        super().__init__(config_entry, metrics)
+        self._attr_name = f"{config_entry.title} Fetch Errors"
+        self._attr_icon = "mdi:alert-circle-outline"
+        self._attr_state_class = SensorStateClass.TOTAL_INCREASING
+
+    @property
+    def native_value(self):
+        return sum(sum(operation.errors.values()) for operation in self._operations(("fetch",)))
+
+    @property
+    def extra_state_attributes(self):
+        fetch = self._metrics.get("fetch")
+        attrs = dict(fetch.errors) if fetch is not None else {}
+        for name in ("token", "device_list", "device_data"):
+            operation = self._metrics.get(name)
+            if operation is not None:
+                for kind, count in operation.errors.items():
+                    attrs[f"{name}_{kind}"] = count
+        return attrs
@@ -0,0 +1,163 @@
+import asyncio
+import logging
+import os
+import time
+import voluptuous as vol
+
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.helpers import config_validation as cv, device_registry as dr
+from homeassistant.util import dt as dt_util
+try:
+    from homeassistant.exceptions import ServiceValidationError
+except ImportError:
+    ServiceValidationError = HomeAssistantError
+
+from .const import (
+    DOMAIN, SERVICE_REFRESH, SERVICE_EXPORT, ATTR_DEVICE_ID, ATTR_CONFIG_ENTRY_ID, EXPORT_DIRECTORY,
+    EXPORT_PROGRESS_INTERVAL, EVENT_EXPORT_PROGRESS, EVENT_EXPORT_COMPLETED
+)
+from .export import FORMAT_CSV, FORMAT_NDJSON, iter_rows, write_export
+from .history import async_get_history_store
+
+_LOGGER = logging.getLogger(__name__)
+
+REFRESH_SCHEMA = vol.All(
+    vol.Schema({
+        vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_CONFIG_ENTRY_ID): vol.All(cv.ensure_list, [cv.string])
+    }),
+    cv.has_at_least_one_key(ATTR_DEVICE_ID, ATTR_CONFIG_ENTRY_ID)
+)
+
+def _file_name(value) -> str:
+    value = cv.string(value)
+    if os.path.basename(value) != value or value.startswith("."):
+        raise vol.Invalid("filename must be a plain file name")
+    return value
+
+EXPORT_SCHEMA = vol.Schema({
+    vol.Optional(ATTR_DEVICE_ID): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional(ATTR_CONFIG_ENTRY_ID): vol.All(cv.ensure_list, [cv.string]),
+    vol.Optional("start_time"): cv.datetime,
+    vol.Optional("end_time"): cv.datetime,
+    vol.Optional("format", default=FORMAT_CSV): vol.In([FORMAT_CSV, FORMAT_NDJSON]),
+    vol.Optional("gzip", default=False): cv.boolean,
+    vol.Optional("filename"): _file_name
+})
+
+def async_setup_services(hass: HomeAssistant) -> None:
+    """Register the integration's services."""
+
+    async def _async_refresh(call: ServiceCall) -> None:
+        coordinators = _resolve_coordinators(hass, call.data)
+        _LOGGER.debug("Refreshing %d tanks on request", len(coordinators))
+        await asyncio.gather(*(coord.async_refresh_now() for coord in coordinators))
+        failed = [coord.device_name for coord in coordinators if not coord.last_update_success]
+        if failed:
+            raise HomeAssistantError(f"Refresh failed for {', '.join(failed)}")
+
+    hass.services.async_register(DOMAIN, SERVICE_REFRESH, _async_refresh, schema=REFRESH_SCHEMA)
+
+    async def _async_export(call: ServiceCall) -> None:
+        if ATTR_DEVICE_ID in call.data or ATTR_CONFIG_ENTRY_ID in call.data:
+            coordinators = _resolve_coordinators(hass, call.data)
+        else:
+            coordinators = [
+                coord for entry in hass.config_entries.async_entries(DOMAIN)
+                if (runtime := _runtime(hass, entry.entry_id)) is not None
+                for coord in runtime["coordinators"].values()
+            ]
+        fmt = call.data["format"]
+        filename = call.data.get("filename") or f"tank_readings_{dt_util.utcnow():%Y%m%d_%H%M%S}.{fmt}"
+        if call.data["gzip"] and not filename.endswith(".gz"):
+            filename += ".gz"
+        path = hass.config.path(EXPORT_DIRECTORY, filename)
+        start, end = call.data.get("start_time"), call.data.get("end_time")
+        hass.async_create_background_task(
+            _async_run_export(
+                hass, path, [(coord.device_id, coord.device_name, coord.data) for coord in coordinators],
+                None if start is None else int(dt_util.as_utc(start).timestamp() * 1000),
+                None if end is None else int(dt_util.as_utc(end).timestamp() * 1000),
+                fmt, call.data["gzip"]
+            ),
+            f"{DOMAIN}_export_{filename}"
+        )
+
+    hass.services.async_register(DOMAIN, SERVICE_EXPORT, _async_export, schema=EXPORT_SCHEMA)
+
+async def _async_run_export(hass: HomeAssistant, path: str, sources: list, start_ms: int, end_ms: int, fmt: str,
+                            compress: bool) -> None:
+    """Write the export in the executor and report progress and completion as events."""
+    # Resolved on the event loop; the store's file map is not shared with the executor.
+    files = async_get_history_store(hass).history_files(device_id for device_id, _name, _data in sources)
+    started = time.monotonic()
+    last_progress = started
+
+    def _progress(rows: int) -> None:
+        # Runs in the executor thread; bus.fire is thread-safe.
+        nonlocal last_progress
+        now = time.monotonic()
+        if now - last_progress >= EXPORT_PROGRESS_INTERVAL:
+            last_progress = now
+            hass.bus.fire(EVENT_EXPORT_PROGRESS, {"path": path, "rows": rows})
+
+    def _export() -> int:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        rows = iter_rows(sources, lambda device_id: files[device_id].iter_range(start_ms, end_ms))
+        return write_export(path, rows, fmt, compress, _progress)
+
+    result = {"path": path, "devices": len(sources), "success": False}
+    try:
+        rows = await hass.async_add_executor_job(_export)
+    except Exception as err:  # Every failure is reported to the caller through the completed event.
+        _LOGGER.error("Export to %s failed: %s", path, err, exc_info=not isinstance(err, OSError))
+        result["error"] = str(err) or type(err).__name__
+    else:
+        _LOGGER.info("Exported %d readings of %d tanks to %s", rows, len(sources), path)
+        result.update(success=True, rows=rows, duration=round(time.monotonic() - started, 3))
+    finally:
+        if not result["success"]:
+            await hass.async_add_executor_job(_remove_partial_export, path)
+    hass.bus.async_fire(EVENT_EXPORT_COMPLETED, result)
+
+def _remove_partial_export(path: str) -> None:
+    try:
+        os.remove(f"{path}.part")
+    except FileNotFoundError:
+        pass
+    except OSError as err:
+        _LOGGER.warning("Could not remove partial export %s.part: %s", path, err)
+
+def _resolve_coordinators(hass: HomeAssistant, data: dict) -> list:
+    """Return the device coordinators named by device IDs and/or config entry IDs, without duplicates."""
+    selected = {}
+    for entry_id in data.get(ATTR_CONFIG_ENTRY_ID, []):
+        runtime = _runtime(hass, entry_id)
+        if runtime is None:
+            raise ServiceValidationError(f"{entry_id} is not a loaded Tank Utility account")
+        selected.update(runtime["coordinators"])
+    registry = dr.async_get(hass)
+    for ha_device_id in data.get(ATTR_DEVICE_ID, []):
+        device = registry.async_get(ha_device_id)
+        coord = _device_coordinator(hass, device) if device is not None else None
+        if coord is None:
+            raise ServiceValidationError(f"{ha_device_id} is not a loaded Tank Utility tank")
+        selected[coord.device_id] = coord
+    return list(selected.values())
+
+def _device_coordinator(hass: HomeAssistant, device):
+    for domain, tank_id in device.identifiers:
+        if domain != DOMAIN:
+            continue
+        for entry_id in device.config_entries:
+            runtime = _runtime(hass, entry_id)
+            if runtime is not None and tank_id in runtime["coordinators"]:
+                return runtime["coordinators"][tank_id]
+    return None
+
+def _runtime(hass: HomeAssistant, entry_id: str) -> dict:
+    entry = hass.config_entries.async_get_entry(entry_id)
+    if entry is None or entry.domain != DOMAIN:
+        return None
+    return hass.data.get(DOMAIN, {}).get(entry_id)
@@ -0,0 +1,46 @@
+import hashlib
+import logging
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.tokens"
+
+def _account_key(email: str) -> str:
+    """Key tokens by a hash of the account so the email is not written twice."""
+    return hashlib.sha256(email.strip().lower().encode()).hexdigest()
+
+class TankUtilityTokenStore:
+    """Persist API tokens, with their issue time and learned lifetime, in HA storage."""
+
+    def __init__(self, hass: HomeAssistant):
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._data = None
+
+    async def _async_data(self) -> dict:
+        if self._data is None:
+            self._data = await self._store.async_load() or {}
+        return self._data
+
+    async def async_load(self, email: str) -> dict:
+        """Return the stored token record for an account, or None."""
+        return (await self._async_data()).get(_account_key(email))
+
+    async def async_save(self, email: str, token: str, issued_at: float, lifetime: float) -> None:
+        """Store a newly issued token for an account."""
+        data = await self._async_data()
+        data[_account_key(email)] = {"token": token, "issued_at": issued_at, "lifetime": lifetime}
+        await self._store.async_save(data)
+        _LOGGER.debug("Persisted API token issued at %s", issued_at)
+
+def async_get_token_store(hass: HomeAssistant) -> TankUtilityTokenStore:
+    """Return the token store shared by every client of this integration."""
+    domain_data = hass.data.setdefault(DOMAIN, {})
+    if "token_store" not in domain_data:
+        domain_data["token_store"] = TankUtilityTokenStore(hass)
+    return domain_data["token_store"]
@@ -0,0 +1,92 @@
+import voluptuous as vol
+
+from homeassistant.components import websocket_api
+from homeassistant.core import HomeAssistant, callback
+
+from .const import DOMAIN, ATTR_TANK_ID, ATTR_CONFIG_ENTRY_ID
+from .history import async_get_history_store
+from .models import TankReading
+
+# Reading fields sent per tank, after the tank's own columns.
+READING_FIELDS = tuple(field for field in TankReading.__slots__ if field != "name")
+FLEET_FIELDS = ("tank_id", "name", "config_entry_id", "available", "fetched_at") + READING_FIELDS
+HISTORY_FIELDS = ("time", "tank", "temperature", "battery_level")
+HISTORY_PAGE_SIZE = 500
+HISTORY_MAX_PAGE_SIZE = 5000
+
+@callback
+def async_setup_websocket(hass: HomeAssistant) -> None:
+    """Register the integration's websocket commands."""
+    websocket_api.async_register_command(hass, websocket_fleet)
+    websocket_api.async_register_command(hass, websocket_history)
+
+def _runtimes(hass: HomeAssistant, entry_id: str = None) -> dict:
+    """Return the runtime data of loaded entries, all of them or just ``entry_id``'s."""
+    runtimes = {}
+    for entry in hass.config_entries.async_entries(DOMAIN):
+        runtime = hass.data.get(DOMAIN, {}).get(entry.entry_id)
+        if runtime is not None and entry_id in (None, entry.entry_id):
+            runtimes[entry.entry_id] = runtime
+    return runtimes
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/fleet",
+    vol.Optional(ATTR_CONFIG_ENTRY_ID): str
+})
+@callback
+def websocket_fleet(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict) -> None:
+    """Return every tank's latest reading in one message, as rows of ``fields``.
+
+    Served from the coordinators' in-memory data, without API requests.
+    ``fetched_at`` is the fetch time of a reading restored from storage (still
+    stale), and None for live readings.
+    """
+    rows = []
+    for entry_id, runtime in _runtimes(hass, msg.get(ATTR_CONFIG_ENTRY_ID)).items():
+        for device_id, coord in runtime["coordinators"].items():
+            data = coord.data
+            rows.append([
+                device_id, coord.device_name, entry_id, coord.last_update_success and data is not None,
+                coord.restored_at, *(getattr(data, field, None) for field in READING_FIELDS)
+            ])
+    connection.send_result(msg["id"], {"fields": FLEET_FIELDS, "rows": rows})
+
+@websocket_api.websocket_command({
+    vol.Required("type"): f"{DOMAIN}/history",
+    vol.Required(ATTR_TANK_ID): str,
+    vol.Optional("start_time"): vol.Coerce(int),
+    vol.Optional("end_time"): vol.Coerce(int),
+    vol.Optional("limit", default=HISTORY_PAGE_SIZE): vol.All(
+        vol.Coerce(int), vol.Range(min=1, max=HISTORY_MAX_PAGE_SIZE)
+    ),
+    vol.Optional("cursor"): str
+})
+@websocket_api.async_response
+async def websocket_history(hass: HomeAssistant, connection: websocket_api.ActiveConnection, msg: dict) -> None:
+    """Return one page of a tank's stored readings with ``start_time <= time < end_time`` (epoch ms).
+
+    ``tank_id`` is the Tank Utility id listed by ``fleet``, not a Home Assistant
+    device id. Rows are oldest first. While more readings remain, ``next_cursor`` is set;
+    sending it back as ``cursor`` with the same range returns the next page.
+    """
+    tank_id = msg[ATTR_TANK_ID]
+    if not any(tank_id in runtime["coordinators"] for runtime in _runtimes(hass).values()):
+        connection.send_error(msg["id"], websocket_api.ERR_NOT_FOUND, f"Unknown tank {tank_id}")
+        return
+    start_ms = msg.get("start_time")
+    if "cursor" in msg:
+        # The cursor is the time just after the last reading sent; record times are unique and increasing.
+        try:
+            start_ms = int(msg["cursor"])
+        except ValueError:
+            connection.send_error(msg["id"], websocket_api.ERR_INVALID_FORMAT, "Invalid cursor")
+            return
+    limit = msg["limit"]
+    records = await async_get_history_store(hass).async_query(tank_id, start_ms, msg.get("end_time"), limit + 1)
+    next_cursor = str(records[limit - 1]["time"] + 1) if len(records) > limit else None
+    connection.send_result(msg["id"], {
+        "tank_id": tank_id,
+        "fields": HISTORY_FIELDS,
+        "rows": [[record[field] for field in HISTORY_FIELDS] for record in records[:limit]],
+        "next_cursor": next_cursor
+    })
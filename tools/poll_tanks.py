@@ -0,0 +1,146 @@
+"""Poll Tank Utility accounts from the command line, without Home Assistant.
+
+Fetches the latest reading of every tank of every account concurrently and
+writes one NDJSON line per reading to stdout. All accounts share one connection
+pool, one concurrency limit (granted round-robin across accounts) and one
+request-rate budget. A summary with the import time and throughput goes to stderr.
+
+    python tools/poll_tanks.py --account me@example.com:secret --concurrency 16
+    python tools/poll_tanks.py --accounts-file accounts.json > readings.ndjson
+
+The accounts file is a JSON list of ``{"email", "password", "devices"}`` objects;
+``devices`` is optional and defaults to every tank of the account.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Run from a checkout: the integration's client modules import without Home Assistant.
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+_LOGGER = logging.getLogger("poll_tanks")
+
+def load_accounts(args) -> list:
+    accounts = []
+    for value in args.account:
+        email, separator, password = value.partition(":")
+        if not separator:
+            raise SystemExit(f"--account expects EMAIL:PASSWORD, got {email!r}")
+        accounts.append({"email": email, "password": password})
+    if args.accounts_file:
+        with open(args.accounts_file, encoding="utf-8") as handle:
+            accounts.extend(json.load(handle))
+    if not accounts:
+        raise SystemExit("No accounts given; use --account or --accounts-file")
+    return accounts
+
+class Poller:
+    """Fetch every account's tanks through shared limits and write the readings as NDJSON."""
+
+    def __init__(self, client_module, resilience, args, output):
+        self.client_module = client_module
+        self.args = args
+        self.output = output
+        self.request_limiter = resilience.FairLimiter(args.concurrency)
+        self.rate_limiter = resilience.TokenBucket(args.rate, args.burst)
+        self.pool_stats = {"connections_created": 0, "connections_reused": 0, "dns_cache_hits": 0,
+                           "dns_cache_misses": 0}
+        self.devices = 0
+        self.readings = 0
+        self.errors = 0
+        self.requests = 0
+
+    async def async_run(self, accounts: list) -> None:
+        session = self.client_module.create_session(self.pool_stats, limit_per_host=self.args.concurrency)
+        try:
+            await asyncio.gather(*(self._async_poll_account(session, account) for account in accounts))
+        finally:
+            await session.close()
+
+    async def _async_poll_account(self, session, account: dict) -> None:
+        client = self.client_module.TankUtilityApiClient(
+            account["email"], account["password"], session=session, api_base=self.args.api_base,
+            rate_limiter=self.rate_limiter, request_limiter=self.request_limiter
+        )
+        try:
+            devices = account.get("devices") or await client.async_list_devices()
+        except self.client_module.TankUtilityError as err:
+            _LOGGER.error("Failed to list tanks of %s: %s", account["email"], err)
+            self.errors += 1
+            self.requests += client.pool_statistics()["requests"]
+            return
+        self.devices += len(devices)
+        await asyncio.gather(*(self._async_poll_device(client, account["email"], device_id) for device_id in devices))
+        self.requests += client.pool_statistics()["requests"]
+
+    async def _async_poll_device(self, client, email: str, device_id: str) -> None:
+        try:
+            reading = await client.async_get_device_data(device_id)
+        except self.client_module.TankUtilityError as err:
+            _LOGGER.error("Failed to fetch tank %s of %s: %s", device_id, email, err)
+            self.errors += 1
+            return
+        record = {
+            "account": email,
+            "device_id": device_id,
+            "fetched_at": datetime.now(timezone.utc).isoformat(),
+            **reading.as_dict()
+        }
+        self.output.write(json.dumps(record, separators=(",", ":")))
+        self.output.write("\n")
+        self.readings += 1
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--account", action="append", default=[], metavar="EMAIL:PASSWORD",
+                        help="Account to poll; may be repeated")
+    parser.add_argument("--accounts-file", help="JSON list of accounts to poll")
+    parser.add_argument("--concurrency", type=int, default=8, help="Requests in flight at once, across all accounts")
+    parser.add_argument("--rate", type=float, default=None, help="Average requests per second, across all accounts")
+    parser.add_argument("--burst", type=int, default=None, help="Requests that may be sent back to back")
+    parser.add_argument("--api-base", default=None, help="API base URL, e.g. of a local replay server")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Log requests to stderr")
+    args = parser.parse_args()
+    if args.concurrency < 1 or args.rate is not None and args.rate <= 0 or args.burst is not None and args.burst < 1:
+        parser.error("--concurrency and --burst must be at least 1, and --rate greater than 0")
+    logging.basicConfig(level=logging.DEBUG if args.verbose else logging.WARNING, stream=sys.stderr,
+                        format="%(levelname)s %(name)s: %(message)s")
+    accounts = load_accounts(args)
+
+    start = time.perf_counter()
+    from custom_components.generac_tank_utility import client as client_module, resilience
+    import_ms = (time.perf_counter() - start) * 1000
+    if args.rate is None:
+        args.rate = client_module.RATE_LIMIT
+    if args.burst is None:
+        args.burst = client_module.RATE_BURST
+
+    poller = Poller(client_module, resilience, args, sys.stdout)
+    start = time.perf_counter()
+    asyncio.run(poller.async_run(accounts))
+    elapsed = time.perf_counter() - start
+    sys.stdout.flush()
+
+    summary = {
+        "import_ms": round(import_ms, 1),
+        "home_assistant_imported": "homeassistant" in sys.modules,
+        "accounts": len(accounts),
+        "devices": poller.devices,
+        "readings": poller.readings,
+        "errors": poller.errors,
+        "requests": poller.requests,
+        "elapsed_s": round(elapsed, 3),
+        "readings_per_s": round(poller.readings / elapsed, 1) if elapsed else None,
+        "connection_pool": poller.pool_stats
+    }
+    print(json.dumps(summary), file=sys.stderr)
+    if poller.errors:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()